@@ -24,6 +24,9 @@ class Settings:
         "SCRAPECREATORS_API_KEY", "fmwCF2KKhHcgGyyKUJd9U6W1TTw2"
     )
 
+    # Redis (response caching; leave empty to disable)
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
+
     # Platform Limits
     MAX_ADS_PER_COMPETITOR: int = int(os.getenv("MAX_ADS_PER_COMPETITOR", "50"))
     GOOGLE_MAX_ENRICHMENT: int = int(os.getenv("GOOGLE_MAX_ENRICHMENT", "3"))
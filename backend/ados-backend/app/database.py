@@ -3,10 +3,20 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 import logging
+import orjson
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Naive datetimes are UTC throughout the app (datetime.utcnow)
+_JSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def json_serializer(value) -> str:
+    """
+    Serializer for JSON/JSONB columns, using orjson instead of json.dumps.
+    """
+    return orjson.dumps(value, option=_JSON_OPTIONS).decode()
+
 # Create database engine
 try:
     engine = create_engine(
@@ -15,6 +25,8 @@ try:
         max_overflow=10,  # Reduced from 30
         pool_pre_ping=True,
         pool_recycle=3600,  # Recycle connections every hour
+        json_serializer=json_serializer,
+        json_deserializer=orjson.loads,
         echo=False
     )
     logger.info(f"Database engine created successfully")
@@ -68,11 +80,106 @@ def create_tables():
     """
     try:
         Base.metadata.create_all(bind=engine)
+        upgrade_schema()
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
         raise
 
+# Schema upgrades for databases created before a model change.
+# create_all only creates missing tables, so columns and constraints added
+# to existing tables are applied here. Each statement must be idempotent.
+_SCHEMA_UPGRADES = [
+    # sum_metrics: one row per (user_id, time_period), needed by the upsert's
+    # ON CONFLICT. Older databases accumulated a row per recalculation, so keep
+    # the most recently calculated one before adding the constraint.
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint WHERE conname = 'uq_sum_metrics_user_period'
+        ) THEN
+            DELETE FROM sum_metrics s
+            USING (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id, time_period
+                    ORDER BY calculated_at DESC NULLS LAST, created_at DESC NULLS LAST
+                ) AS rn
+                FROM sum_metrics
+            ) ranked
+            WHERE s.id = ranked.id AND ranked.rn > 1;
+
+            ALTER TABLE sum_metrics
+                ADD CONSTRAINT uq_sum_metrics_user_period UNIQUE (user_id, time_period);
+        END IF;
+    END $$
+    """,
+    # targ_intel: one row per (competitor_id, user_id), the upsert's conflict
+    # target. Keep the most recently calculated row of any duplicates.
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint WHERE conname = 'uq_targ_intel_competitor_user'
+        ) THEN
+            DELETE FROM targ_intel t
+            USING (
+                SELECT id, row_number() OVER (
+                    PARTITION BY competitor_id, user_id
+                    ORDER BY last_calculated_at DESC NULLS LAST, created_at DESC NULLS LAST
+                ) AS rn
+                FROM targ_intel
+            ) ranked
+            WHERE t.id = ranked.id AND ranked.rn > 1;
+
+            ALTER TABLE targ_intel
+                ADD CONSTRAINT uq_targ_intel_competitor_user UNIQUE (competitor_id, user_id);
+        END IF;
+    END $$
+    """,
+    # targ_intel.content_hash: digest of the calculated values, used to skip
+    # no-op updates (NULL on existing rows until their next calculation)
+    """
+    ALTER TABLE targ_intel ADD COLUMN IF NOT EXISTS content_hash varchar(16)
+    """,
+    # sum_metrics.previous_competitor_spend: set by the upsert from the row it
+    # replaces, so the dashboard can report the spend change
+    """
+    ALTER TABLE sum_metrics ADD COLUMN IF NOT EXISTS previous_competitor_spend double precision
+    """,
+    # Grouped platform distribution over a competitor's active ads
+    """
+    CREATE INDEX IF NOT EXISTS ix_ads_competitor_active_platform ON ads (competitor_id, is_active, platform)
+    """,
+    # Competitor ad timelines (first_seen ranges per competitor)
+    """
+    CREATE INDEX IF NOT EXISTS ix_ads_competitor_first_seen ON ads (competitor_id, first_seen)
+    """,
+    # Latest-metrics lookups: filter by competitor and period, newest first
+    """
+    CREATE INDEX IF NOT EXISTS ix_surv_metrics_competitor_period_calculated
+        ON surv_metrics (competitor_id, time_period, calculated_at DESC)
+    """,
+]
+
+def upgrade_schema():
+    """
+    Apply schema upgrades to existing PostgreSQL tables.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    
+    try:
+        with engine.begin() as conn:
+            # Serialize concurrent workers starting up at the same time
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('ados_schema_upgrade'))"))
+            for statement in _SCHEMA_UPGRADES:
+                conn.execute(text(statement))
+        logger.info("Database schema upgrades applied successfully")
+    except Exception as e:
+        logger.error(f"Failed to apply database schema upgrades: {e}")
+        raise
+
 # Database health check
 def check_database_health():
     """
@@ -1,9 +1,12 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine, Base, upgrade_schema
 from app.routers import users, competitors, ads, platforms, metrics, trending, targ_intel , sum_metrics # Make sure metrics is imported
+from app.services.reddit_service import RedditAdsService
+from app.services.youtube_service import YouTubeService
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,15 +17,22 @@ async def lifespan(app: FastAPI):
     logger.info("Starting ADOS Ad Surveillance API")
     # Create tables (in production, use migrations instead)
     Base.metadata.create_all(bind=engine)
+    # Bring tables created by earlier releases up to the current models
+    upgrade_schema()
+    await RedditAdsService.warmup()
+    await YouTubeService.warmup()
     yield
     # Shutdown
     logger.info("Shutting down ADOS API")
+    await RedditAdsService.aclose()
+    await YouTubeService.aclose()
 
 app = FastAPI(
     title="ADOS Ad Surveillance API",
     description="Track competitor ads across multiple platforms",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Numeric, Text, Date, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Numeric, Text, Date, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -46,17 +46,29 @@ class SumMetrics(Base):
     total_impressions = Column(Integer, nullable=False, default=0)
     avg_ctr = Column(Float, nullable=False, default=0.0)
     
+    # Total spend of the calculation this row replaced, for the dashboard's spend change
+    previous_competitor_spend = Column(Float, nullable=True)
+    
     # Metadata
     is_active = Column(Boolean, default=True)
     calculated_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        UniqueConstraint('user_id', 'time_period', name='uq_sum_metrics_user_period'),
+    )
+    
     def __repr__(self):
         return f"<SumMetrics(user_id={self.user_id}, period={self.time_period}, spend=${self.total_competitor_spend:,.0f})>"
 
 class TargIntel(Base):
     __tablename__ = "targ_intel"
+    __table_args__ = (
+        # Conflict target for the upsert; its index also serves the
+        # per-competitor freshness lookups (at most one row per pair)
+        UniqueConstraint('competitor_id', 'user_id', name='uq_targ_intel_competitor_user'),
+    )
     
     # Primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -119,6 +131,7 @@ class TargIntel(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_calculated_at = Column(DateTime(timezone=True), nullable=True)
+    content_hash = Column(String(16), nullable=True)  # Digest of calculated values, to skip no-op updates
     
     # Raw analysis data for debugging
     raw_analysis = Column(JSON, nullable=True)
@@ -167,7 +180,8 @@ class Competitor(Base):
     user = relationship("User", back_populates="competitors")
     ad_fetches = relationship("AdFetch", back_populates="competitor")
     ads = relationship("Ad", back_populates="competitor")
-    metrics = relationship("SurvMetrics", back_populates="competitor", cascade="all, delete-orphan")
+    metrics = relationship("SurvMetrics", back_populates="competitor", cascade="all, delete-orphan",
+                           order_by="SurvMetrics.calculated_at.desc()")
 
 
 class Ad(Base):
@@ -195,6 +209,8 @@ class Ad(Base):
     
     __table_args__ = (
         UniqueConstraint('competitor_id', 'platform', 'platform_ad_id', name='uq_competitor_platform_ad'),
+        Index('ix_ads_competitor_active_platform', 'competitor_id', 'is_active', 'platform'),
+        Index('ix_ads_competitor_first_seen', 'competitor_id', 'first_seen'),
     )
 
 
@@ -271,4 +287,13 @@ class SurvMetrics(Base):
     competitor = relationship("Competitor", back_populates="metrics")
     
     def __repr__(self):
-        return f"<SurvMetrics(id={self.id}, competitor={self.competitor_id}, period={self.time_period})>"
\ No newline at end of file
+        return f"<SurvMetrics(id={self.id}, competitor={self.competitor_id}, period={self.time_period})>"
+
+
+# Latest-metrics lookups: filter by competitor and period, newest first
+Index(
+    'ix_surv_metrics_competitor_period_calculated',
+    SurvMetrics.competitor_id,
+    SurvMetrics.time_period,
+    SurvMetrics.calculated_at.desc()
+)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime
@@ -13,6 +13,7 @@ router = APIRouter()
 @router.post("/search", response_model=TrendingSearchResponse)
 async def search_trending_ads(
     request: TrendingSearchRequest,
+    response: Response,
     background_tasks: BackgroundTasks = None,
     current_user: User = Depends(get_current_user)
 ):
@@ -94,6 +95,8 @@ async def search_trending_ads(
         platforms=request.platforms,
         limit_per_platform=request.limit_per_platform
     )
+    if "cache_status" in results:
+        response.headers["X-Cache"] = results["cache_status"]
     
     return TrendingSearchResponse(
         task_id=None,
@@ -107,8 +110,10 @@ async def search_trending_ads(
 
 
 @router.get("/platforms")
-async def get_available_platforms():
+async def get_available_platforms(response: Response):
     """Get list of available platforms for trending search"""
+    # Static and unauthenticated, so shared caches/CDNs can serve it
+    response.headers["Cache-Control"] = "public, s-maxage=300, stale-while-revalidate=86400"
     return {
         "platforms": [
             {
@@ -423,6 +423,7 @@ class TrendingSummary(BaseModel):
     top_score: float = Field(..., description="Highest trending score")
     average_score: float = Field(..., description="Average trending score across all results")
     search_duration: Optional[float] = Field(None, description="Time taken for search in seconds")
+    partial: bool = Field(False, description="True if some platforms timed out and are missing from the results")
 
     class Config:
         from_attributes = True
@@ -0,0 +1,95 @@
+"""
+Single-pass keyword scanning for the targeting extractors.
+
+KeywordScanner reports every keyword that occurs as a substring of a text,
+overlaps included, in one scan; find_sections splits the matches of one scan
+between several slices of the text. pyahocorasick is not a hard dependency: when
+it is not installed AHOCORASICK_AVAILABLE is False and a single compiled
+regex does the scan instead.
+"""
+import re
+from typing import FrozenSet, Iterable, Iterator, Sequence, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordScanner:
+    """Find all of a fixed set of keywords in a text with one scan"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(keywords)
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+            self.find = self._find_automaton
+            self._spans = self._spans_automaton
+        else:
+            # Longest keyword first inside a lookahead, so every start position
+            # is tried; shorter keywords starting there are covered via _contained
+            ordered = sorted(self.keywords, key=len, reverse=True)
+            self._pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+            self._contained = {
+                keyword: frozenset(other for other in self.keywords if other in keyword)
+                for keyword in self.keywords
+            }
+            # (offset, keyword) for every occurrence of a keyword inside another
+            self._contained_at = {
+                keyword: tuple(
+                    (offset, other)
+                    for other in self._contained[keyword]
+                    for offset in _occurrences(other, keyword)
+                )
+                for keyword in self.keywords
+            }
+            self.find = self._find_regex
+            self._spans = self._spans_regex
+
+    def _find_automaton(self, text: str) -> FrozenSet[str]:
+        return frozenset(keyword for _, keyword in self._automaton.iter(text))
+
+    def _find_regex(self, text: str) -> FrozenSet[str]:
+        found = set()
+        for match in self._pattern.finditer(text):
+            found.update(self._contained[match.group(1)])
+        return frozenset(found)
+
+    def find_sections(self, text: str,
+                      sections: Sequence[Tuple[int, int]]) -> Tuple[FrozenSet[str], ...]:
+        """
+        Keywords lying wholly inside each (start, end) slice of text.
+
+        Equivalent to calling find on every text[start:end], with a single
+        scan of text.
+        """
+        found = tuple(set() for _ in sections)
+        for start, end, keyword in self._spans(text):
+            for (low, high), section_found in zip(sections, found):
+                if low <= start and end <= high:
+                    section_found.add(keyword)
+        return tuple(frozenset(section_found) for section_found in found)
+
+    def _spans_automaton(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, keyword) for every keyword occurrence in text"""
+        for last, keyword in self._automaton.iter(text):
+            yield last - len(keyword) + 1, last + 1, keyword
+
+    def _spans_regex(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        for match in self._pattern.finditer(text):
+            position = match.start()
+            for offset, keyword in self._contained_at[match.group(1)]:
+                yield position + offset, position + offset + len(keyword), keyword
+
+
+def _occurrences(needle: str, haystack: str) -> Iterator[int]:
+    """Start offsets of needle in haystack, overlaps included"""
+    offset = haystack.find(needle)
+    while offset != -1:
+        yield offset
+        offset = haystack.find(needle, offset + 1)
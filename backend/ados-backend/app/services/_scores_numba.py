@@ -0,0 +1,34 @@
+"""
+Optional numba-compiled kernels for metrics scoring.
+
+numba is not a hard dependency: when it is not installed NUMBA_AVAILABLE is
+False and callers fall back to their numpy implementation.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def capped_platform_sum(idx, counts, weights, scale):
+        """Sum of min(weight * count / scale, weight) over platforms"""
+        total = 0.0
+        for i in range(idx.shape[0]):
+            weight = weights[idx[i]]
+            total += min(weight * (counts[i] / scale), weight)
+        return total
+
+    # Compile at import so the first request doesn't pay the JIT cost
+    capped_platform_sum(
+        np.zeros(1, dtype=np.intp),
+        np.zeros(1, dtype=np.float64),
+        np.ones(1, dtype=np.float64),
+        10.0
+    )
+else:
+    capped_platform_sum = None
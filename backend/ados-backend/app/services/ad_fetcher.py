@@ -9,6 +9,7 @@ from app.services.reddit_service import RedditAdsService
 from app.services.linkedin_service import LinkedInAdsService
 from app.services.youtube_service import YouTubeService
 from app.services.instagram_service import InstagramService
+from app.services.targ_intel_calculator import TargIntelCalculator
 from app.utils.logger import get_logger
 from datetime import datetime
 import json
@@ -248,6 +249,7 @@ class AdFetcher:
             ad_fetch.platforms_queried = json.dumps([p for p in platforms if results.get(p)])
             
             self.db.commit()
+            TargIntelCalculator.invalidate(competitor.id, competitor.user_id)
             
             logger.info(f"Ads saved for {competitor.name}: {new_ads_count} new, {updated_ads_count} updated, {actual_ads_count} total active ads")
             
@@ -4,15 +4,78 @@ from typing import List, Dict, Any, Optional
 from decimal import Decimal
 import uuid
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_
 import json
 import re
 from collections import Counter
+from types import MappingProxyType
+
+import numpy as np
 
 from app.models import Ad, Competitor, SurvMetrics
+from app.services._scores_numba import NUMBA_AVAILABLE, capped_platform_sum
+from app.services.targ_intel_calculator import TargIntelCalculator
 
 logger = logging.getLogger(__name__)
 
+# Platform-specific device preferences as (mobile, desktop, tablet) rows.
+# The last row is the fallback for platforms not listed here.
+_DEVICE_KEYS = ('mobile', 'desktop', 'tablet')
+_DEVICE_PLATFORM_INDEX = {
+    'instagram': 0,
+    'tiktok': 1,
+    'facebook': 2,
+    'meta': 3,
+    'linkedin': 4,
+    'google': 5,
+    'youtube': 6,
+    'reddit': 7,
+}
+_DEVICE_DEFAULT_INDEX = len(_DEVICE_PLATFORM_INDEX)
+_DEVICE_MATRIX = np.array([
+    [0.95, 0.04, 0.01],
+    [0.98, 0.01, 0.01],
+    [0.80, 0.15, 0.05],
+    [0.80, 0.15, 0.05],
+    [0.60, 0.35, 0.05],
+    [0.65, 0.30, 0.05],
+    [0.70, 0.25, 0.05],
+    [0.55, 0.40, 0.05],
+    [0.60, 0.30, 0.10],
+], dtype=np.float64)
+
+# Per-platform weights for risk and opportunity scoring
+_PLATFORM_RISK = MappingProxyType({
+    'google': 25,
+    'meta': 20,
+    'facebook': 20,
+    'linkedin': 15,
+    'youtube': 15,
+    'instagram': 10,
+    'tiktok': 10,
+    'reddit': 5
+})
+
+_PLATFORM_OPP = MappingProxyType({
+    'google': 25,
+    'meta': 20,
+    'facebook': 20,
+    'linkedin': 30,  # LinkedIn often has higher-value opportunities
+    'youtube': 15,
+    'instagram': 20,
+    'tiktok': 25,    # TikTok is emerging with opportunities
+    'reddit': 10
+})
+
+_META_KEYS = frozenset(('meta', 'facebook'))
+
+# Weight vectors aligned to a canonical platform index; the last slot
+# holds the default weight for platforms not listed above
+_SCORE_PLATFORM_INDEX = MappingProxyType({platform: i for i, platform in enumerate(_PLATFORM_RISK)})
+_SCORE_DEFAULT_INDEX = len(_PLATFORM_RISK)
+_RISK_WEIGHTS = np.array([*_PLATFORM_RISK.values(), 5], dtype=np.float64)
+_OPP_WEIGHTS = np.array([_PLATFORM_OPP[platform] for platform in _PLATFORM_RISK] + [10], dtype=np.float64)
+
 
 class MetricsCalculator:
     def __init__(self, db: Session):
@@ -38,13 +101,38 @@ class MetricsCalculator:
             # Get date range
             start_date, end_date = self._get_date_range(time_period)
             
-            # Check if metrics already exist for this period
-            existing_metrics = self.db.query(SurvMetrics).filter(
+            # Previous period of the same length, used for trend comparison
+            period_days = (end_date - start_date).days + 1
+            prev_start = start_date - timedelta(days=period_days)
+            prev_end = start_date - timedelta(days=1)
+            
+            # Fetch this period's metrics and the previous period's metrics in one query
+            period_metrics = self.db.query(SurvMetrics).filter(
                 SurvMetrics.competitor_id == competitor_id,
-                SurvMetrics.time_period == time_period,
-                SurvMetrics.start_date == start_date,
-                SurvMetrics.end_date == end_date
-            ).first()
+                or_(
+                    and_(
+                        SurvMetrics.time_period == time_period,
+                        SurvMetrics.start_date == start_date,
+                        SurvMetrics.end_date == end_date
+                    ),
+                    and_(
+                        SurvMetrics.start_date >= prev_start,
+                        SurvMetrics.end_date <= prev_end
+                    )
+                )
+            ).order_by(SurvMetrics.calculated_at.desc()).all()
+            
+            # Check if metrics already exist for this period
+            existing_metrics = next(
+                (m for m in period_metrics
+                 if m.time_period == time_period and m.start_date == start_date and m.end_date == end_date),
+                None
+            )
+            prev_metrics = next(
+                (m for m in period_metrics
+                 if m.start_date >= prev_start and m.end_date <= prev_end),
+                None
+            )
             
             # Get ads within date range
             ads = self.db.query(Ad).filter(
@@ -108,7 +196,7 @@ class MetricsCalculator:
                 'ad_timeline': self._serialize_for_json(self._build_ad_timeline(ads)),
                 
                 # Derived Insights
-                'trends': self._serialize_for_json(self._analyze_trends(competitor_id, start_date, end_date)),
+                'trends': self._serialize_for_json(self._analyze_trends(prev_metrics, total_ads)),
                 'recommendations': self._serialize_for_json(self._generate_recommendations(ads, platform_counts)),
                 'risk_score': self._calculate_risk_score(total_ads, active_ads, platform_counts),
                 'opportunity_score': self._calculate_opportunity_score(total_ads, platform_counts)
@@ -134,6 +222,7 @@ class MetricsCalculator:
             
             self.db.commit()
             self.db.refresh(metrics)
+            TargIntelCalculator.invalidate(competitor_id, competitor.user_id)
             
             logger.info(f"Successfully calculated metrics for competitor {competitor.name}")
             return metrics
@@ -637,31 +726,20 @@ class MetricsCalculator:
                 "tablet": 0.1
             }
         
-        # Platform-specific device preferences
-        platform_device_pref = {
-            'instagram': {'mobile': 0.95, 'desktop': 0.04, 'tablet': 0.01},
-            'tiktok': {'mobile': 0.98, 'desktop': 0.01, 'tablet': 0.01},
-            'facebook': {'mobile': 0.80, 'desktop': 0.15, 'tablet': 0.05},
-            'meta': {'mobile': 0.80, 'desktop': 0.15, 'tablet': 0.05},
-            'linkedin': {'mobile': 0.60, 'desktop': 0.35, 'tablet': 0.05},
-            'google': {'mobile': 0.65, 'desktop': 0.30, 'tablet': 0.05},
-            'youtube': {'mobile': 0.70, 'desktop': 0.25, 'tablet': 0.05},
-            'reddit': {'mobile': 0.55, 'desktop': 0.40, 'tablet': 0.05}
-        }
+        platform_counts = Counter((ad.platform or 'google').lower() for ad in ads)
         
-        device_totals = {'mobile': 0, 'desktop': 0, 'tablet': 0}
+        counts = np.zeros(len(_DEVICE_MATRIX), dtype=np.float64)
+        for platform, count in platform_counts.items():
+            counts[_DEVICE_PLATFORM_INDEX.get(platform, _DEVICE_DEFAULT_INDEX)] += count
         
-        for ad in ads:
-            platform = (ad.platform or 'google').lower()
-            pref = platform_device_pref.get(platform, {'mobile': 0.6, 'desktop': 0.3, 'tablet': 0.1})
-            
-            for device, weight in pref.items():
-                device_totals[device] += weight
+        # Weighted sum of device preferences in one matrix product
+        device_totals = counts @ _DEVICE_MATRIX
         
         # Normalize
-        total = sum(device_totals.values())
+        total = device_totals.sum()
         if total > 0:
-            return {device: round(weight / total, 2) for device, weight in device_totals.items()}
+            device_totals /= total
+            return {device: round(float(weight), 2) for device, weight in zip(_DEVICE_KEYS, device_totals)}
         else:
             return {
                 "mobile": 0.6,
@@ -716,20 +794,13 @@ class MetricsCalculator:
         
         return timeline
     
-    def _analyze_trends(self, competitor_id: uuid.UUID, start_date: date, end_date: date) -> Dict[str, Any]:
-        """Analyze trends by comparing with previous period"""
+    def _analyze_trends(
+        self,
+        prev_metrics: Optional[SurvMetrics],
+        current_ads: int
+    ) -> Dict[str, Any]:
+        """Analyze trends by comparing with previous period's metrics"""
         try:
-            # Get previous period's metrics for comparison
-            period_days = (end_date - start_date).days + 1
-            prev_start = start_date - timedelta(days=period_days)
-            prev_end = start_date - timedelta(days=1)
-            
-            prev_metrics = self.db.query(SurvMetrics).filter(
-                SurvMetrics.competitor_id == competitor_id,
-                SurvMetrics.start_date >= prev_start,
-                SurvMetrics.end_date <= prev_end
-            ).order_by(SurvMetrics.calculated_at.desc()).first()
-            
             if not prev_metrics:
                 return {
                     'status': 'no_previous_data',
@@ -737,13 +808,6 @@ class MetricsCalculator:
                     'trend': 'neutral'
                 }
             
-            # Get current ads count for this period
-            current_ads = self.db.query(Ad).filter(
-                Ad.competitor_id == competitor_id,
-                Ad.first_seen >= start_date,
-                Ad.first_seen <= end_date
-            ).count()
-            
             prev_ads = prev_metrics.total_ads or 0
             
             # Calculate trend
@@ -789,7 +853,7 @@ class MetricsCalculator:
             missing_platforms = []
             if 'google' not in platform_counts:
                 missing_platforms.append("Google Search")
-            if 'meta' not in platform_counts and 'facebook' not in platform_counts:
+            if not platform_counts.keys() & _META_KEYS:
                 missing_platforms.append("Facebook/Meta")
             if 'linkedin' not in platform_counts:
                 missing_platforms.append("LinkedIn")
@@ -798,8 +862,11 @@ class MetricsCalculator:
                 recommendations.append(f"Consider monitoring competitor's presence on: {', '.join(missing_platforms)}")
         
         # Creative recommendations
-        image_count = sum(1 for ad in ads if ad.image_url)
-        video_count = sum(1 for ad in ads if ad.video_url)
+        image_count = 0
+        video_count = 0
+        for ad in ads:
+            image_count += bool(ad.image_url)
+            video_count += bool(ad.video_url)
         
         if video_count == 0 and image_count > 5:
             recommendations.append("Competitor uses mostly static images - video ads could be an opportunity")
@@ -822,6 +889,30 @@ class MetricsCalculator:
         
         return recommendations[:5]
     
+    def _platform_score_vectors(self, platform_counts: Dict):
+        """Map platform counts to (weight index, count) arrays for vectorized scoring"""
+        index = _SCORE_PLATFORM_INDEX
+        default = _SCORE_DEFAULT_INDEX
+        idx = np.fromiter(
+            (index.get(platform.lower(), default) for platform in platform_counts),
+            dtype=np.intp,
+            count=len(platform_counts)
+        )
+        counts = np.fromiter(platform_counts.values(), dtype=np.float64, count=len(platform_counts))
+        return idx, counts
+    
+    def _capped_platform_sum(self, platform_counts: Dict, weights: np.ndarray, scale: float) -> float:
+        """Sum of per-platform weights scaled by count / scale, each capped at its weight"""
+        if not platform_counts:
+            return 0.0
+        
+        idx, counts = self._platform_score_vectors(platform_counts)
+        if NUMBA_AVAILABLE:
+            return capped_platform_sum(idx, counts, weights, float(scale))
+        
+        platform_weights = weights[idx]
+        return float(np.minimum(platform_weights * (counts / scale), platform_weights).sum())
+    
     def _calculate_risk_score(self, total_ads: int, active_ads: int, platform_counts: Dict) -> int:
         """Calculate risk score (higher = more risky/competitive)"""
         score = 50  # Base score
@@ -836,21 +927,8 @@ class MetricsCalculator:
         elif total_ads > 20:
             score += 20
         
-        # Platform diversity risk
-        platform_risk = {
-            'google': 25,
-            'meta': 20,
-            'facebook': 20,
-            'linkedin': 15,
-            'youtube': 15,
-            'instagram': 10,
-            'tiktok': 10,
-            'reddit': 5
-        }
-        
-        for platform, count in platform_counts.items():
-            risk = platform_risk.get(platform.lower(), 5)
-            score += min(risk * (count / 10), risk)  # Scale by count
+        # Platform diversity risk, scaled by count and capped per platform
+        score += self._capped_platform_sum(platform_counts, _RISK_WEIGHTS, 10)
         
         # Active ads risk
         if total_ads > 0:
@@ -870,21 +948,8 @@ class MetricsCalculator:
         # Volume opportunity
         score += min(total_ads * 2, 40)  # More ads = more data = more opportunities
         
-        # Platform opportunity
-        platform_opp = {
-            'google': 25,
-            'meta': 20,
-            'facebook': 20,
-            'linkedin': 30,  # LinkedIn often has higher-value opportunities
-            'youtube': 15,
-            'instagram': 20,
-            'tiktok': 25,    # TikTok is emerging with opportunities
-            'reddit': 10
-        }
-        
-        for platform, count in platform_counts.items():
-            opp = platform_opp.get(platform.lower(), 10)
-            score += min(opp * (count / 5), opp)  # Scale by count but with diminishing returns
+        # Platform opportunity, scaled by count but with diminishing returns
+        score += self._capped_platform_sum(platform_counts, _OPP_WEIGHTS, 5)
         
         # Platform diversity bonus
         unique_platforms = len(platform_counts)
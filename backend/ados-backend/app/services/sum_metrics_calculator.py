@@ -1,15 +1,48 @@
 import logging
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, case, and_
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime, timedelta
 from uuid import UUID
 
 from app.models import Competitor, SurvMetrics, SumMetrics, Ad
 from app.utils.logger import get_logger
+from app.utils.cache import TTLCache, RedisCache
 
 logger = get_logger(__name__)
 
+# Process-local first tier in front of the 6-hour SumMetrics row, keyed by
+# (user_id, time_period) like the DB lookup. Holds column snapshots, not ORM objects.
+_summary_cache = TTLCache(maxsize=1024, ttl=300)
+
+# Shared dashboard payloads, keyed by user_id
+_dashboard_cache = RedisCache("dash", ttl=300)
+
+
+@lru_cache(maxsize=8)
+def _date_range_for_minute(time_period: str, now: datetime) -> Tuple[Optional[datetime], datetime]:
+    """Date range for a time period ending at ``now`` (cached per minute)"""
+    if time_period == "daily":
+        start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = now
+    elif time_period == "weekly":
+        start_date = now - timedelta(days=7)
+        end_date = now
+    elif time_period == "monthly":
+        start_date = now - timedelta(days=30)
+        end_date = now
+    elif time_period == "all_time":
+        start_date = None
+        end_date = now
+    else:
+        start_date = now - timedelta(days=30)  # Default to monthly
+        end_date = now
+    
+    return start_date, end_date
+
+
 class SumMetricsCalculator:
     """Simple calculator for summary metrics"""
     
@@ -23,227 +56,199 @@ class SumMetricsCalculator:
                          force_recalculate: bool = False) -> Optional[SumMetrics]:
         """Calculate simple summary metrics for a user's competitors"""
         try:
+            now = datetime.utcnow()
+            
             # Determine date range based on time_period
-            start_date, end_date = self._get_date_range(time_period)
+            start_date, end_date = self._get_date_range(time_period, now)
+            
+            cache_key = (user_id, time_period)
             
-            # Check if recent calculation exists (within 6 hours)
-            if not force_recalculate:
+            # Check if recent calculation exists (process cache, then within 6 hours in DB)
+            if force_recalculate:
+                _summary_cache.pop(cache_key)
+            else:
+                snapshot = _summary_cache.get(cache_key)
+                if snapshot is not None:
+                    logger.info(f"Using in-process cached summary metrics for user {user_id}, period {time_period}")
+                    return SumMetrics(**snapshot)
+                
                 existing = self.db.query(SumMetrics).filter(
                     SumMetrics.user_id == user_id,
                     SumMetrics.time_period == time_period,
                     SumMetrics.is_active == True,
-                    SumMetrics.calculated_at >= datetime.utcnow() - timedelta(hours=6)
+                    SumMetrics.calculated_at >= now - timedelta(hours=6)
                 ).first()
                 
                 if existing:
                     logger.info(f"Using cached summary metrics for user {user_id}, period {time_period}")
-                    return existing
+                    return self._remember(cache_key, existing)
             
-            # Get ALL user's competitors
-            query = self.db.query(Competitor).filter(
+            # Filters selecting the user's competitors
+            competitor_filters = [
                 Competitor.user_id == user_id,
                 Competitor.is_active == True
-            )
+            ]
             
             if competitor_ids:
-                query = query.filter(Competitor.id.in_(competitor_ids))
-            
-            competitors = query.all()
-            
-            if not competitors:
-                logger.warning(f"No active competitors found for user {user_id}")
-                return self._create_empty_sum_metrics(user_id, time_period)
-            
-            # Calculate simple metrics
-            total_spend = 0.0
-            total_active_campaigns = 0
-            total_weighted_ctr = 0.0
-            total_weight = 0.0
-            total_impressions = 0
+                competitor_filters.append(Competitor.id.in_(competitor_ids))
             
-            ctr_values = []
-            total_competitors = len(competitors)
-            
-            for competitor in competitors:
-                # Get latest metrics for this competitor
-                metrics = self._get_latest_metrics(competitor.id, time_period)
-                
-                # Get monthly spend - first try from metrics, then from competitor
-                monthly_spend = 0.0
-                if metrics and metrics.estimated_monthly_spend:
-                    monthly_spend = float(metrics.estimated_monthly_spend)
-                elif competitor.estimated_monthly_spend:
-                    monthly_spend = float(competitor.estimated_monthly_spend)
-                
-                total_spend += monthly_spend
-                
-                # Get active campaigns - count from ads table directly
-                active_ads = self._count_active_ads(competitor.id)
-                total_active_campaigns += active_ads
-                
-                if metrics:
-                    # Get CTR from metrics
-                    ctr = float(metrics.avg_ctr) if metrics.avg_ctr else 0.0
-                    ctr_values.append(ctr)
-                    
-                    # Weight CTR by spend for average calculation
-                    weight = monthly_spend if monthly_spend > 0 else 1
-                    total_weighted_ctr += ctr * weight
-                    total_weight += weight
-                    
-                    # Estimate impressions
-                    impressions = self._estimate_impressions(metrics, monthly_spend)
-                    total_impressions += impressions
-            
-            logger.info(f"Processing {total_competitors} competitors for user {user_id}")
-            logger.info(f"Total spend: ${total_spend:,.0f}, Active ads: {total_active_campaigns}")
+            (total_competitors, total_spend, total_active_campaigns,
+             total_weighted_ctr, total_weight, total_impressions) = self._aggregate_competitor_totals(
+                competitor_filters, time_period
+            )
             
             # Calculate weighted average CTR
             avg_ctr = 0.0
             if total_weight > 0:
                 avg_ctr = total_weighted_ctr / total_weight
-            elif ctr_values:
-                avg_ctr = sum(ctr_values) / len(ctr_values)
             
-            # Log CTR calculation
-            logger.info(f"CTR calculation: weighted_ctr={total_weighted_ctr}, weight={total_weight}, avg_ctr={avg_ctr}")
+            if not total_competitors:
+                # No competitors: the all-zero totals are saved as an empty summary
+                logger.warning(f"No active competitors found for user {user_id}")
+            else:
+                logger.info(f"Processing {total_competitors} competitors for user {user_id}")
+                logger.info(f"Total spend: ${total_spend:,.0f}, Active ads: {total_active_campaigns}")
+                
+                # Log CTR calculation
+                logger.info(f"CTR calculation: weighted_ctr={total_weighted_ctr}, weight={total_weight}, avg_ctr={avg_ctr}")
             
             # Create or update SumMetrics record
-            sum_metrics = self.db.query(SumMetrics).filter(
-                SumMetrics.user_id == user_id,
-                SumMetrics.time_period == time_period
-            ).first()
-            
-            if not sum_metrics:
-                sum_metrics = SumMetrics(
-                    user_id=user_id,
-                    time_period=time_period,
-                    start_date=start_date,
-                    end_date=end_date,
-                    total_competitors=total_competitors,
-                    total_competitor_spend=total_spend,
-                    active_campaigns=total_active_campaigns,
-                    total_impressions=total_impressions,
-                    avg_ctr=avg_ctr,
-                    is_active=True
-                )
-                self.db.add(sum_metrics)
-            else:
-                # Update existing record
-                sum_metrics.total_competitors = total_competitors
-                sum_metrics.total_competitor_spend = total_spend
-                sum_metrics.active_campaigns = total_active_campaigns
-                sum_metrics.total_impressions = total_impressions
-                sum_metrics.avg_ctr = avg_ctr
-                sum_metrics.is_active = True
+            sum_metrics = self._upsert_sum_metrics(
+                user_id=user_id,
+                time_period=time_period,
+                start_date=start_date,
+                end_date=end_date,
+                total_competitors=total_competitors,
+                total_competitor_spend=total_spend,
+                active_campaigns=total_active_campaigns,
+                total_impressions=total_impressions,
+                avg_ctr=avg_ctr,
+                is_active=True
+            )
             
+            # RETURNING already loaded every column; detach the row so the
+            # commit doesn't expire it and force a reload
+            self.db.expunge(sum_metrics)
             self.db.commit()
-            self.db.refresh(sum_metrics)
+            _dashboard_cache.delete(user_id)
             
             logger.info(f"✅ Calculated summary metrics for user {user_id}: "
                        f"${total_spend:,.0f} total spend, {total_active_campaigns} active campaigns, "
                        f"{total_competitors} competitors, {avg_ctr:.2%} avg CTR")
             
-            return sum_metrics
+            return self._remember(cache_key, sum_metrics)
             
         except Exception as e:
             logger.error(f"❌ Error calculating summary metrics for user {user_id}: {e}", exc_info=True)
             self.db.rollback()
             return None
     
-    def _get_date_range(self, time_period: str):
-        """Get date range based on time period"""
-        now = datetime.utcnow()
-        
-        if time_period == "daily":
-            start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_date = now
-        elif time_period == "weekly":
-            start_date = now - timedelta(days=7)
-            end_date = now
-        elif time_period == "monthly":
-            start_date = now - timedelta(days=30)
-            end_date = now
-        elif time_period == "all_time":
-            start_date = None
-            end_date = now
-        else:
-            start_date = now - timedelta(days=30)  # Default to monthly
-            end_date = now
-        
-        return start_date, end_date
-    
-    def _get_latest_metrics(self, competitor_id: UUID, time_period: str) -> Optional[SurvMetrics]:
-        """Get latest metrics for a competitor"""
-        try:
-            metrics = self.db.query(SurvMetrics).filter(
-                SurvMetrics.competitor_id == competitor_id,
-                SurvMetrics.time_period == time_period
-            ).order_by(SurvMetrics.calculated_at.desc()).first()
-            
-            return metrics
-            
-        except Exception as e:
-            logger.warning(f"Error getting metrics for competitor {competitor_id}: {e}")
-            return None
+    def _remember(self, cache_key, sum_metrics: SumMetrics) -> SumMetrics:
+        """Store a column snapshot of sum_metrics in the process-local cache"""
+        _summary_cache.set(cache_key, {
+            column.key: getattr(sum_metrics, column.key)
+            for column in SumMetrics.__table__.columns
+        })
+        return sum_metrics
     
-    def _count_active_ads(self, competitor_id: UUID) -> int:
-        """Count active ads for a competitor directly from ads table"""
-        try:
-            count = self.db.query(func.count(Ad.id)).filter(
-                Ad.competitor_id == competitor_id,
-                Ad.is_active == True
-            ).scalar()
-            
-            return count or 0
-            
-        except Exception as e:
-            logger.warning(f"Error counting active ads for competitor {competitor_id}: {e}")
-            return 0
+    def _get_date_range(self, time_period: str, now: datetime):
+        """Get date range based on time period, at minute resolution"""
+        return _date_range_for_minute(time_period, now.replace(second=0, microsecond=0))
     
-    def _estimate_impressions(self, metrics: SurvMetrics, monthly_spend: float) -> int:
-        """Estimate impressions from spend and CPM"""
-        if monthly_spend <= 0:
-            return 0
-            
-        # Use avg_cpm from metrics if available
-        if metrics.avg_cpm and float(metrics.avg_cpm) > 0:
-            cpm = float(metrics.avg_cpm)
-            impressions = int((monthly_spend / cpm) * 1000)
-        else:
-            # Use default CPM
-            impressions = int((monthly_spend / self.DEFAULT_CPM) * 1000)
-            
-        return impressions
+    def _aggregate_competitor_totals(self, competitor_filters: List, time_period: str) -> Tuple[int, float, int, float, float, int]:
+        """Aggregate spend, active ads, CTR and impressions across competitors in one query
+        
+        Returns (total_competitors, total_spend, active_campaigns, weighted_ctr, ctr_weight, impressions).
+        Monthly spend comes from the competitor's latest metrics for the period, falling back to the
+        competitor's own estimate; CTR weights and impressions only count competitors with metrics.
+        """
+        competitor_ids = select(Competitor.id).where(*competitor_filters)
+        
+        # Latest metrics row per competitor for this period
+        latest = self.db.query(
+            SurvMetrics.competitor_id.label('competitor_id'),
+            SurvMetrics.estimated_monthly_spend.label('estimated_monthly_spend'),
+            SurvMetrics.avg_ctr.label('avg_ctr'),
+            SurvMetrics.avg_cpm.label('avg_cpm'),
+            func.row_number().over(
+                partition_by=SurvMetrics.competitor_id,
+                order_by=SurvMetrics.calculated_at.desc()
+            ).label('rn')
+        ).filter(
+            SurvMetrics.competitor_id.in_(competitor_ids),
+            SurvMetrics.time_period == time_period
+        ).subquery()
+        
+        # Active ads per competitor
+        active = self.db.query(
+            Ad.competitor_id.label('competitor_id'),
+            func.count(Ad.id).label('active_ads')
+        ).filter(
+            Ad.competitor_id.in_(competitor_ids),
+            Ad.is_active == True
+        ).group_by(Ad.competitor_id).subquery()
+        
+        has_metrics = latest.c.competitor_id.isnot(None)
+        monthly_spend = func.coalesce(
+            func.nullif(latest.c.estimated_monthly_spend, 0),
+            func.nullif(Competitor.estimated_monthly_spend, 0),
+            0
+        )
+        weight = case((monthly_spend > 0, monthly_spend), else_=1)
+        cpm = case((latest.c.avg_cpm > 0, latest.c.avg_cpm), else_=self.DEFAULT_CPM)
+        
+        totals = self.db.query(
+            func.count(Competitor.id),
+            func.coalesce(func.sum(monthly_spend), 0),
+            func.coalesce(func.sum(active.c.active_ads), 0),
+            func.coalesce(func.sum(case((has_metrics, func.coalesce(latest.c.avg_ctr, 0) * weight))), 0),
+            func.coalesce(func.sum(case((has_metrics, weight))), 0),
+            func.coalesce(func.sum(case((and_(has_metrics, monthly_spend > 0), func.floor(monthly_spend / cpm * 1000)))), 0)
+        ).select_from(Competitor).outerjoin(
+            latest, and_(latest.c.competitor_id == Competitor.id, latest.c.rn == 1)
+        ).outerjoin(
+            active, active.c.competitor_id == Competitor.id
+        ).filter(*competitor_filters).one()
+        
+        return (
+            int(totals[0]),
+            float(totals[1]),
+            int(totals[2]),
+            float(totals[3]),
+            float(totals[4]),
+            int(totals[5])
+        )
     
-    def _create_empty_sum_metrics(self, user_id: UUID, time_period: str) -> SumMetrics:
-        """Create empty summary metrics when no data is available"""
-        try:
-            sum_metrics = SumMetrics(
-                user_id=user_id,
-                time_period=time_period,
-                total_competitors=0,
-                total_competitor_spend=0.0,
-                active_campaigns=0,
-                total_impressions=0,
-                avg_ctr=0.0,
-                is_active=True
-            )
-            
-            self.db.add(sum_metrics)
-            self.db.commit()
-            self.db.refresh(sum_metrics)
-            
-            logger.info(f"Created empty summary metrics for user {user_id}")
-            return sum_metrics
-            
-        except Exception as e:
-            logger.error(f"Error creating empty summary metrics: {e}")
-            raise
+    def _upsert_sum_metrics(self, **values) -> SumMetrics:
+        """Insert or update the (user_id, time_period) SumMetrics row in one statement"""
+        stmt = insert(SumMetrics).values(**values)
+        update_values = {
+            key: stmt.excluded[key]
+            for key in values
+            if key not in ('user_id', 'time_period')
+        }
+        # The existing row's spend, before this update overwrites it
+        update_values['previous_competitor_spend'] = SumMetrics.__table__.c.total_competitor_spend
+        update_values['calculated_at'] = func.now()
+        update_values['updated_at'] = func.now()
+        
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SumMetrics.user_id, SumMetrics.time_period],
+            set_=update_values
+        ).returning(SumMetrics)
+        
+        return self.db.scalars(stmt, execution_options={"populate_existing": True}).one()
     
     def get_summary_dashboard(self, user_id: UUID) -> Dict:
         """Get simple dashboard view"""
         try:
+            cached = _dashboard_cache.get(user_id)
+            if cached is not None:
+                return {
+                    "success": True,
+                    "dashboard": cached
+                }
+            
             # Get current monthly summary
             current_summary = self.calculate_for_user(user_id, time_period="monthly")
             
@@ -259,19 +264,14 @@ class SumMetricsCalculator:
             # Get top competitors by spend
             top_competitors = self._get_top_competitors(user_id, limit=5)
             
-            # Get previous summary for comparison
-            prev_summary = self.db.query(SumMetrics).filter(
-                SumMetrics.user_id == user_id,
-                SumMetrics.time_period == "monthly",
-                SumMetrics.is_active == True,
-                SumMetrics.id != current_summary.id
-            ).order_by(SumMetrics.calculated_at.desc()).first()
+            # Spend of the calculation this summary replaced
+            prev_spend = current_summary.previous_competitor_spend
             
             # Calculate spend change
             spend_change = 0.0
-            if prev_summary and prev_summary.total_competitor_spend > 0:
-                spend_change = ((current_summary.total_competitor_spend - prev_summary.total_competitor_spend) / 
-                              prev_summary.total_competitor_spend) * 100
+            if prev_spend and prev_spend > 0:
+                spend_change = ((current_summary.total_competitor_spend - prev_spend) / 
+                              prev_spend) * 100
             
             dashboard = {
                 "total_competitor_spend": current_summary.total_competitor_spend,
@@ -284,6 +284,8 @@ class SumMetricsCalculator:
                 "top_competitors": top_competitors
             }
             
+            _dashboard_cache.set(user_id, dashboard)
+            
             return {
                 "success": True,
                 "dashboard": dashboard
@@ -299,30 +301,17 @@ class SumMetricsCalculator:
     def _get_platform_distribution(self, user_id: UUID) -> Dict[str, float]:
         """Get platform distribution from ads"""
         try:
-            # Get all competitors for this user
-            competitors = self.db.query(Competitor).filter(
+            # Count active ads by platform across all of the user's active competitors
+            ads_by_platform = self.db.query(Ad.platform, func.count(Ad.id)).join(
+                Competitor, Ad.competitor_id == Competitor.id
+            ).filter(
                 Competitor.user_id == user_id,
-                Competitor.is_active == True
-            ).all()
-            
-            if not competitors:
-                return {}
-            
-            platform_counts = {}
-            total_ads = 0
+                Competitor.is_active == True,
+                Ad.is_active == True
+            ).group_by(Ad.platform).all()
             
-            for competitor in competitors:
-                # Count ads by platform for this competitor
-                ads_by_platform = self.db.query(Ad.platform, func.count(Ad.id)).filter(
-                    Ad.competitor_id == competitor.id,
-                    Ad.is_active == True
-                ).group_by(Ad.platform).all()
-                
-                for platform, count in ads_by_platform:
-                    if platform not in platform_counts:
-                        platform_counts[platform] = 0
-                    platform_counts[platform] += count
-                    total_ads += count
+            platform_counts = dict(ads_by_platform)
+            total_ads = sum(platform_counts.values())
             
             # Convert to percentages
             platform_distribution = {}
@@ -339,23 +328,30 @@ class SumMetricsCalculator:
     def _get_top_competitors(self, user_id: UUID, limit: int = 5) -> List[Dict]:
         """Get top competitors by estimated monthly spend"""
         try:
-            competitors = self.db.query(Competitor).filter(
+            # Competitors with their active ads count in one query
+            rows = self.db.query(
+                Competitor.name,
+                Competitor.domain,
+                Competitor.estimated_monthly_spend,
+                func.count(Ad.id).filter(Ad.is_active == True)
+            ).outerjoin(
+                Ad, Ad.competitor_id == Competitor.id
+            ).filter(
                 Competitor.user_id == user_id,
                 Competitor.is_active == True
-            ).order_by(Competitor.estimated_monthly_spend.desc()).limit(limit).all()
+            ).group_by(Competitor.id).order_by(
+                Competitor.estimated_monthly_spend.desc()
+            ).limit(limit).all()
             
             top_competitors = []
-            for competitor in competitors:
-                # Get active ads count
-                active_ads = self._count_active_ads(competitor.id)
-                
-                monthly_spend = float(competitor.estimated_monthly_spend) if competitor.estimated_monthly_spend else 0.0
+            for name, domain, estimated_monthly_spend, active_ads in rows:
+                monthly_spend = float(estimated_monthly_spend) if estimated_monthly_spend else 0.0
                 
                 top_competitors.append({
-                    "name": competitor.name,
+                    "name": name,
                     "monthly_spend": monthly_spend,
                     "active_ads": active_ads,
-                    "domain": competitor.domain
+                    "domain": domain
                 })
             
             return top_competitors
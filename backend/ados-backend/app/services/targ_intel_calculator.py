@@ -1,29 +1,474 @@
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from bisect import bisect_right
+from typing import Dict, FrozenSet, List, Any, Mapping, NamedTuple, Optional, Tuple, Union
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from sqlalchemy import func, select, update, and_, text
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timezone
+import hashlib
 import json
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter, itemgetter
+from types import MappingProxyType
 from uuid import UUID
-from collections import Counter
+from collections import Counter, defaultdict
 
+import numpy as np
+import orjson
+
+from app.database import SessionLocal
 from app.models import Competitor, SurvMetrics, TargIntel, Ad
 from app.utils.logger import get_logger
+from app.utils.cache import TTLCache, RedisCache
+from app.services._keyword_scan import KeywordScanner
 
 logger = get_logger(__name__)
 
+# Calculations stay fresh for 24 hours, in Redis as well as in the DB
+_INTEL_TTL_SECONDS = 24 * 60 * 60
+
+# Higher values keep early refreshes closer to the end of the TTL
+_EARLY_REFRESH_EXPONENT = 4
+
+# Cache-aside copies of TargIntel rows, keyed by "{user_id}:{competitor_id}"
+_intel_cache = RedisCache("targintel:v1", ttl=_INTEL_TTL_SECONDS)
+
+# Per-process CachedTargIntel in front of Redis for competitors polled within seconds
+_intel_local_cache = TTLCache(maxsize=1024, ttl=60)
+
+# Batches larger than this are split across worker threads, each with its
+# own session. Workers stay below the engine pool size (5) so the caller's
+# session always has a connection.
+_PARALLEL_CHUNK_SIZE = 50
+_PARALLEL_MAX_WORKERS = 4
+
+_UUID_COLUMNS = ("id", "competitor_id", "user_id")
+_DATETIME_COLUMNS = ("created_at", "updated_at", "last_calculated_at")
+
+
+# Cluster-name keyword -> age range
+_CLUSTER_AGE_KEYWORDS = MappingProxyType({
+    'teen': '18-24', 'teenager': '18-24', 'college': '18-24', 'student': '18-24',
+    'young': '18-34', 'youth': '18-34', 'millennial': '25-40',
+    'adult': '25-54', 'professional': '25-54', 'working': '25-54',
+    'middle': '35-54', 'family': '25-44', 'parent': '25-44',
+    'senior': '55+', 'retired': '55+', 'retirement': '55+'
+})
+
+# Ad-copy keyword -> representative age
+_AD_AGE_KEYWORDS = MappingProxyType({
+    "teen": 13, "teenager": 13, "college": 18, "university": 18,
+    "young": 18, "youth": 18, "adult": 25, "professional": 30,
+    "middle": 40, "senior": 55, "retirement": 60, "family": 35
+})
+
+# Gender keywords in cluster names; "girl" appears twice and counts double
+_CLUSTER_MALE_KEYWORDS = ("male", "men", "guy", "father", "dad", "brother", "boy")
+_CLUSTER_FEMALE_KEYWORDS = ("female", "women", "girl", "mother", "mom", "sister", "girl")
+
+# Audience type indicators in cluster names, checked in this order
+_CLUSTER_AUDIENCE_INDICATORS = (
+    ("retargeting", frozenset(("retarget", "remarket", "existing", "previous", "returning"))),
+    ("lookalike", frozenset(("lookalike", "similar", "alike", "match"))),
+    ("custom", frozenset(("custom", "specific", "targeted", "niche"))),
+)
+
+# Device names in metrics data -> our device categories, checked in this order
+_DEVICE_MAPPING = (
+    ("mobile", frozenset(("mobile", "phone", "smartphone", "android", "ios"))),
+    ("desktop", frozenset(("desktop", "computer", "pc", "mac", "laptop"))),
+    ("tablet", frozenset(("tablet", "ipad", "android tablet"))),
+)
+
+_AD_MALE_KEYWORDS = ("men", "male", "guy", "father", "dad", "brother", "son", "he", "him", "his")
+_AD_FEMALE_KEYWORDS = ("women", "female", "girl", "lady", "mother", "mom", "sister", "daughter", "she", "her", "hers")
+
+# Interest category -> keywords, for cluster names and for ad copy
+_CLUSTER_INTEREST_MAPPING = MappingProxyType({
+    "fitness": frozenset(("fitness", "workout", "gym", "exercise", "health", "wellness")),
+    "technology": frozenset(("tech", "software", "app", "digital", "coding", "programming")),
+    "fashion": frozenset(("fashion", "style", "clothing", "wear", "outfit", "apparel")),
+    "travel": frozenset(("travel", "vacation", "tour", "destination", "hotel")),
+    "food": frozenset(("food", "restaurant", "recipe", "cooking", "meal", "dining")),
+    "finance": frozenset(("finance", "investment", "banking", "money", "stock")),
+    "education": frozenset(("education", "learning", "course", "study", "school")),
+    "entertainment": frozenset(("entertainment", "movie", "music", "game", "streaming")),
+    "sports": frozenset(("sports", "athletic", "game", "team", "player")),
+    "business": frozenset(("business", "enterprise", "corporate", "office", "work")),
+    "luxury": frozenset(("luxury", "premium", "exclusive", "high-end", "designer")),
+})
+
+_AD_INTEREST_MAPPING = MappingProxyType({
+    "fitness": frozenset(("fitness", "workout", "exercise", "gym", "health", "wellness")),
+    "technology": frozenset(("tech", "gadget", "software", "app", "digital", "innovation")),
+    "fashion": frozenset(("fashion", "clothing", "style", "wear", "outfit", "apparel")),
+    "travel": frozenset(("travel", "vacation", "tour", "destination", "hotel", "flight")),
+    "food": frozenset(("food", "restaurant", "recipe", "cooking", "meal", "dining")),
+    "finance": frozenset(("finance", "investment", "banking", "money", "saving", "wealth")),
+    "education": frozenset(("education", "learning", "course", "study", "school", "university")),
+    "entertainment": frozenset(("entertainment", "movie", "music", "game", "streaming", "fun")),
+    "sports": frozenset(("sports", "athletic", "game", "team", "player", "competition")),
+    "business": frozenset(("business", "enterprise", "corporate", "office", "professional", "work")),
+    "luxury": frozenset(("luxury", "premium", "exclusive", "high-end", "elite", "designer")),
+})
+
+# Ad-copy keyword tables, category -> keywords. Scores count the distinct
+# keywords found per ad; ties go to the first category listed.
+_AD_INCOME_KEYWORDS = MappingProxyType({
+    "luxury": frozenset(("luxury", "premium", "exclusive", "high-end", "designer",
+                         "bespoke", "custom", "elite", "prestigious", "expensive")),
+    "affordable": frozenset(("affordable", "budget", "cheap", "discount", "sale",
+                             "value", "economical", "low-cost", "bargain")),
+})
+
+_AD_FUNNEL_KEYWORDS = MappingProxyType({
+    "awareness": frozenset(("new", "introducing", "discover", "learn", "what is", "about", "awareness")),
+    "consideration": frozenset(("compare", "features", "benefits", "why choose", "review", "guide", "how to")),
+    "conversion": frozenset(("buy", "purchase", "order", "shop", "get", "deal", "offer", "sale", "discount", "limited")),
+    "retention": frozenset(("thank you", "loyal", "member", "exclusive", "update", "newsletter", "community")),
+})
+
+_AD_AUDIENCE_INDICATORS = MappingProxyType({
+    "retargeting": frozenset(("existing", "previous", "returning", "again", "back", "reminder")),
+    "broad": frozenset(("everyone", "all", "anyone", "public", "general", "wide")),
+    "lookalike": frozenset(("similar", "like you", "alike", "match", "compatible")),
+})
+
+_AD_BIDDING_INDICATORS = MappingProxyType({
+    "cpc": frozenset(("click", "ctr", "engagement", "action", "visit")),
+    "cpm": frozenset(("impression", "view", "awareness", "brand")),
+    "tROAS": frozenset(("roas", "return", "revenue", "sales", "conversion", "purchase")),
+    "reach": frozenset(("reach", "audience", "people", "users", "followers")),
+    "frequency_cap": frozenset(("frequency", "limit", "cap", "maximum", "times")),
+})
+
+# Call-to-action type -> phrases in ad descriptions
+_AD_CTA_KEYWORDS = MappingProxyType({
+    "shop_now": frozenset(("shop now", "buy now", "purchase", "order", "get it", "buy today")),
+    "learn_more": frozenset(("learn more", "find out", "discover", "read more", "see how")),
+    "sign_up": frozenset(("sign up", "register", "join", "enroll", "become a member")),
+    "contact_us": frozenset(("contact us", "get in touch", "call us", "email us", "message us")),
+    "download": frozenset(("download", "get the app", "install", "get your copy")),
+    "subscribe": frozenset(("subscribe", "follow", "stay updated", "get updates")),
+    "book_now": frozenset(("book now", "reserve", "schedule", "make appointment")),
+    "get_started": frozenset(("get started", "start now", "begin", "try free")),
+})
+
+# Ad format keywords, checked in this order
+_MOBILE_FORMATS = ("story", "reel", "short", "vertical", "tiktok")
+_MIXED_DEVICE_FORMATS = ("carousel", "image", "display", "banner")
+_VIDEO_FORMATS = ("video", "youtube")
+_VIDEO_CONTENT_FORMATS = ("video", "reel", "short", "youtube")
+_IMAGE_CONTENT_FORMATS = ("image", "photo", "picture")
+
+# Ad count thresholds between the audience sizes below
+_AUDIENCE_SIZE_THRESHOLDS = (3, 10, 20)
+_AUDIENCE_SIZES = ("small", "medium", "large", "very_large")
+
+# Funnel stage names in metrics data -> our funnel stages
+_FUNNEL_STAGE_ALIASES = MappingProxyType({
+    "awareness": "awareness",
+    "consideration": "consideration",
+    "conversion": "conversion",
+    "retention": "retention",
+    "acquisition": "awareness",
+    "engagement": "consideration",
+    "purchase": "conversion",
+    "loyalty": "retention"
+})
+
+_CONFIDENCE_KEYS = (
+    "age", "gender", "geography", "interests", "income",
+    "device", "funnel", "audience", "bidding", "content", "performance"
+)
+
+# Confidence floor for a score when any of these metrics fields is populated
+_METRICS_CONFIDENCE_BOOSTS = (
+    ("geography", ("geo_penetration",), 0.7),
+    ("income", ("estimated_monthly_spend",), 0.7),
+    ("device", ("device_distribution",), 0.8),
+    ("funnel", ("funnel_stage_distribution",), 0.8),
+    ("audience", ("audience_clusters",), 0.7),
+    ("bidding", ("avg_cpc", "avg_cpm", "conversion_probability"), 0.6),
+)
+_performance_metrics_values = attrgetter("avg_cpm", "avg_cpc", "avg_ctr", "estimated_monthly_spend")
+_DEFAULT_CONFIDENCE_SCORES = MappingProxyType(dict.fromkeys(_CONFIDENCE_KEYS, 0.1))
+
+# Standard age ranges; np.digitize against the lower edges maps an age to
+# its range index + 1. Small lists are cheaper to bucket in plain Python.
+_AGE_BIN_EDGES = np.array([18, 25, 35, 45, 55], dtype=np.int16)
+_AGE_RANGE_LABELS = ("18-24", "25-34", "35-44", "45-54", "55+")
+_AGE_NUMPY_MIN_SIZE = 32
+
+# Name keywords used to infer age and gender from the competitor itself
+_NAME_AGE_RULES = (
+    (("kid", "child", "toy", "baby", "toddler"), {"min_age": 0, "max_age": 12, "range": "0-12", "confidence": 0.6}),
+    (("teen", "youth", "college", "student"), {"min_age": 13, "max_age": 24, "range": "13-24", "confidence": 0.6}),
+    (("luxury", "premium", "wealth", "elite"), {"min_age": 35, "max_age": 65, "range": "35-65", "confidence": 0.5}),
+    (("retirement", "senior", "elder"), {"min_age": 55, "max_age": 75, "range": "55+", "confidence": 0.7}),
+)
+_NAME_MALE_KEYWORDS = ("men", "groom", "shave", "barber", "male")
+_NAME_FEMALE_KEYWORDS = ("women", "beauty", "cosmetic", "makeup", "female")
+
+# Name keywords used to infer interests and income from the competitor itself
+_NAME_INTEREST_MAPPING = MappingProxyType({
+    "technology": frozenset(("tech", "software", "app", "digital", "cloud")),
+    "fitness": frozenset(("fit", "gym", "health", "wellness", "exercise")),
+    "fashion": frozenset(("style", "wear", "fashion", "clothing", "apparel")),
+    "travel": frozenset(("travel", "tour", "hotel", "flight", "vacation")),
+    "food": frozenset(("food", "restaurant", "cafe", "kitchen", "meal")),
+    "finance": frozenset(("bank", "finance", "money", "capital", "investment")),
+    "education": frozenset(("edu", "learn", "school", "academy", "course")),
+    "luxury": frozenset(("luxury", "premium", "exclusive", "elite")),
+})
+_NAME_INCOME_RULES = (
+    (("luxury", "premium", "exclusive", "designer", "elite"), {"level": "luxury", "score": 0.9, "confidence": 0.7}),
+    (("discount", "budget", "cheap", "value", "affordable"), {"level": "low", "score": 0.3, "confidence": 0.7}),
+)
+_INDUSTRY_HIGH_INCOME_KEYWORDS = ("finance", "banking", "investment", "consulting")
+
+# One scanner over every keyword table above
+_KEYWORD_SCANNER = KeywordScanner(chain(
+    _CLUSTER_AGE_KEYWORDS, _CLUSTER_MALE_KEYWORDS, _CLUSTER_FEMALE_KEYWORDS,
+    chain.from_iterable(words for _, words in _CLUSTER_AUDIENCE_INDICATORS),
+    chain.from_iterable(words for _, words in _DEVICE_MAPPING),
+    _AD_AGE_KEYWORDS, _AD_MALE_KEYWORDS, _AD_FEMALE_KEYWORDS,
+    chain.from_iterable(_CLUSTER_INTEREST_MAPPING.values()),
+    chain.from_iterable(_AD_INTEREST_MAPPING.values()),
+    chain.from_iterable(_AD_INCOME_KEYWORDS.values()),
+    chain.from_iterable(_AD_FUNNEL_KEYWORDS.values()),
+    chain.from_iterable(_AD_AUDIENCE_INDICATORS.values()),
+    chain.from_iterable(_AD_BIDDING_INDICATORS.values()),
+    chain.from_iterable(_AD_CTA_KEYWORDS.values()),
+    chain.from_iterable(words for words, _ in _NAME_AGE_RULES),
+    _NAME_MALE_KEYWORDS, _NAME_FEMALE_KEYWORDS,
+    chain.from_iterable(_NAME_INTEREST_MAPPING.values()),
+    chain.from_iterable(words for words, _ in _NAME_INCOME_RULES),
+    _INDUSTRY_HIGH_INCOME_KEYWORDS,
+))
+
+
+@lru_cache(maxsize=8192)
+def _keywords_in(text: str) -> FrozenSet[str]:
+    """Keywords that occur as substrings of lowercased text"""
+    return _KEYWORD_SCANNER.find(text)
+
+
+@lru_cache(maxsize=8192)
+def _ad_keywords_in(headline: str, description: str,
+                    full_text: str) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+    """
+    Keywords in an ad's description, in " headline description" and in
+    " headline description full_text" (lowercased parts, each "" if missing),
+    from a single scan of the full text.
+    """
+    text = ""
+    if headline:
+        text += " " + headline
+    description_start = len(text) + 1
+    if description:
+        text += " " + description
+    copy_end = len(text)
+    if full_text:
+        text += " " + full_text
+    return _KEYWORD_SCANNER.find_sections(
+        text, ((description_start, copy_end), (0, copy_end), (0, len(text)))
+    )
+
+
+# Device weight (mobile, desktop) for each ad format bucket
+_FORMAT_DEVICE_WEIGHTS = MappingProxyType({
+    "mobile": (1, 0),
+    "mixed": (0.5, 0.5),
+    "video": (0.3, 0.7),
+})
+
+
+@lru_cache(maxsize=1024)
+def _format_device_bucket(ad_format: str) -> Optional[str]:
+    """Device bucket for a raw ad format, or None if it says nothing about device"""
+    format_lower = ad_format.lower()
+    if any(word in format_lower for word in _MOBILE_FORMATS):
+        return "mobile"
+    elif any(word in format_lower for word in _MIXED_DEVICE_FORMATS):
+        return "mixed"
+    elif any(word in format_lower for word in _VIDEO_FORMATS):
+        return "video"
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _format_content_type(ad_format: Optional[str]) -> str:
+    """Content type for a raw ad format (image when missing)"""
+    if not ad_format:
+        return "image"
+    format_lower = ad_format.lower()
+    if any(word in format_lower for word in _VIDEO_CONTENT_FORMATS):
+        return "video"
+    elif any(word in format_lower for word in _IMAGE_CONTENT_FORMATS):
+        return "image"
+    elif "carousel" in format_lower:
+        return "carousel"
+    elif "story" in format_lower:
+        return "story"
+    return "text"
+
+
+@lru_cache(maxsize=1024)
+def _device_category(device: str) -> str:
+    """Our device category for a raw device name (desktop if unknown)"""
+    found = _keywords_in(device.lower())
+    for category, keywords in _DEVICE_MAPPING:
+        if not found.isdisjoint(keywords):
+            return category
+    return "desktop"
+
+
+class TextIndex(NamedTuple):
+    """Keyword matches over a competitor's name and ads, shared by the extractors"""
+    # keywords in the competitor name
+    name_keywords: FrozenSet[str]
+    # keywords in each ad's description
+    description_keywords: List[FrozenSet[str]]
+    # keyword -> number of ads whose description contains it
+    description_counts: Counter
+    # keyword -> number of ads whose headline or description contains it
+    copy_counts: Counter
+    # keywords in each ad's headline, description and full text
+    ad_keywords: List[FrozenSet[str]]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedTargIntel:
+    """Read-only TargIntel row served from cache, without ORM instrumentation"""
+    id: UUID
+    competitor_id: UUID
+    user_id: UUID
+    age_min: Optional[int]
+    age_max: Optional[int]
+    age_range: Optional[str]
+    gender_ratio: Optional[Dict[str, float]]
+    primary_gender: Optional[str]
+    geography: Optional[Dict[str, List[str]]]
+    primary_location: Optional[str]
+    interest_clusters: Optional[List[str]]
+    primary_interests: Optional[List[str]]
+    income_level: Optional[str]
+    income_score: Optional[float]
+    device_distribution: Optional[Dict[str, float]]
+    primary_device: Optional[str]
+    funnel_stage: Optional[str]
+    funnel_score: Optional[float]
+    audience_type: Optional[str]
+    audience_size: Optional[str]
+    bidding_strategy: Optional[str]
+    bidding_confidence: Optional[float]
+    content_type: Optional[str]
+    call_to_action: Optional[str]
+    estimated_cpm: Optional[float]
+    estimated_cpc: Optional[float]
+    estimated_roas: Optional[float]
+    engagement_rate: Optional[float]
+    confidence_scores: Optional[Dict[str, float]]
+    overall_confidence: Optional[float]
+    is_active: Optional[bool]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    last_calculated_at: Optional[datetime]
+    content_hash: Optional[str]
+    raw_analysis: Optional[Dict[str, Any]]
+
+
+# Calculated or existing rows are ORM instances; cache hits are CachedTargIntel
+IntelResult = Union[TargIntel, CachedTargIntel]
+
+
+# Country TLDs
+_TLD_COUNTRIES = MappingProxyType({
+    ".com": "US", ".org": "US", ".net": "US",
+    ".uk": "UK", ".co.uk": "UK",
+    ".ca": "Canada",
+    ".au": "Australia",
+    ".de": "Germany",
+    ".fr": "France",
+    ".jp": "Japan",
+    ".cn": "China",
+    ".in": "India",
+    ".br": "Brazil",
+    ".mx": "Mexico",
+})
+
+# A TLD at the end of the host name (before any port or path); longer
+# suffixes first so ".co.uk" wins over ".uk"
+_TLD_RE = re.compile(
+    "(" + "|".join(re.escape(tld) for tld in sorted(_TLD_COUNTRIES, key=len, reverse=True)) + r")(?=[:/]|$)",
+    re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=4096)
+def _country_for_domain(domain: str) -> str:
+    """Country implied by a domain's TLD, defaulting to US"""
+    match = _TLD_RE.search(domain)
+    return _TLD_COUNTRIES[match.group(1).lower()] if match else "US"
+
+
+def _content_hash(values: Dict[str, Any]) -> str:
+    """16-hex-digit digest of computed TargIntel values, used to skip no-op writes"""
+    payload = orjson.dumps(values, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def _epoch(value: datetime) -> float:
+    """Unix timestamp for a datetime; naive values are UTC (datetime.utcnow)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _should_refresh_early(cached_at: float) -> bool:
+    """Probabilistic early expiry so hot keys don't all recompute at once"""
+    age = max(time.time() - cached_at, 0.0)
+    return random.random() < (age / _INTEL_TTL_SECONDS) ** _EARLY_REFRESH_EXPONENT
+
+
+def _intel_snapshot(targ_intel: TargIntel) -> Dict[str, Any]:
+    """Column values of a TargIntel row"""
+    return {column.key: getattr(targ_intel, column.key) for column in TargIntel.__table__.columns}
+
+
+def _intel_from_snapshot(snapshot: Dict[str, Any]) -> CachedTargIntel:
+    """Read-only TargIntel rebuilt from a cached snapshot"""
+    data = dict(snapshot)
+    for key in _UUID_COLUMNS:
+        if isinstance(data.get(key), str):
+            data[key] = UUID(data[key])
+    for key in _DATETIME_COLUMNS:
+        if isinstance(data.get(key), str):
+            data[key] = datetime.fromisoformat(data[key])
+    return CachedTargIntel(**data)
+
+
 class TargIntelCalculator:
     """Calculate targeting intelligence from competitor metrics"""
     
-    # Default values for when data is missing
-    DEFAULT_VALUES = {
+    # Default values for when data is missing. Read-only and shared, so the
+    # nested mappings are copied before they go into a result
+    DEFAULT_VALUES = MappingProxyType({
         "age_range": "25-34",
-        "gender_ratio": {"male": 0.5, "female": 0.5, "other": 0.0},
+        "gender_ratio": MappingProxyType({"male": 0.5, "female": 0.5, "other": 0.0}),
         "primary_gender": "balanced",
-        "geography": {"countries": ["US"], "states": [], "cities": []},
+        "geography": MappingProxyType({"countries": ("US",), "states": (), "cities": ()}),
         "primary_location": "United States",
         "income_level": "middle",
         "income_score": 0.5,
-        "device_distribution": {"mobile": 0.6, "desktop": 0.35, "tablet": 0.05},
+        "device_distribution": MappingProxyType({"mobile": 0.6, "desktop": 0.35, "tablet": 0.05}),
         "primary_device": "mobile",
         "funnel_stage": "awareness",
         "funnel_score": 0.5,
@@ -37,142 +482,372 @@ class TargIntelCalculator:
         "estimated_cpc": 1.5,
         "estimated_roas": 2.0,
         "engagement_rate": 0.02,
-    }
+    })
+    
+    # Performance estimates when metrics are missing
+    DEFAULT_PERFORMANCE = MappingProxyType({
+        "cpm": DEFAULT_VALUES["estimated_cpm"],
+        "cpc": DEFAULT_VALUES["estimated_cpc"],
+        "roas": DEFAULT_VALUES["estimated_roas"],
+        "engagement_rate": DEFAULT_VALUES["engagement_rate"],
+    })
+    
+    # Built on first use by _create_basic_intel; the defaults never change
+    _basic_intel_values: Optional[Mapping[str, Any]] = None
     
     def __init__(self, db: Session):
         self.db = db
     
+    def _default_geography(self) -> Dict[str, List[str]]:
+        """Mutable copy of the default geography"""
+        return {key: list(value) for key, value in self.DEFAULT_VALUES["geography"].items()}
+    
     def calculate_for_competitor(self, competitor_id: UUID, user_id: UUID, 
-                               force_recalculate: bool = False) -> Optional[TargIntel]:
+                               force_recalculate: bool = False) -> Optional[IntelResult]:
         """Calculate targeting intelligence for a single competitor"""
+        results = self.calculate_for_competitors([competitor_id], user_id, force_recalculate)
+        return results.get(competitor_id)
+    
+    @staticmethod
+    def invalidate(competitor_id: UUID, user_id: UUID) -> None:
+        """Drop the cached TargIntel for a competitor after its ads or metrics change"""
+        cache_key = f"{user_id}:{competitor_id}"
+        _intel_local_cache.pop(cache_key)
+        _intel_cache.delete(cache_key)
+    
+    def calculate_for_competitors(self, competitor_ids: List[UUID], user_id: UUID,
+                                  force_recalculate: bool = False) -> Dict[UUID, Optional[IntelResult]]:
+        """
+        Calculate targeting intelligence for several competitors at once.
+        
+        Fresh results are served from the in-process cache, then Redis. The
+        rest load competitors, existing intel, latest metrics and active ads
+        with a single IN query each, so the number
+        of round-trips does not grow with the batch size. Very large batches
+        are split across worker threads. Competitors that fail map to None.
+        """
+        results: Dict[UUID, Optional[IntelResult]] = {cid: None for cid in competitor_ids}
+        if not competitor_ids:
+            return results
+        
+        if len(competitor_ids) > _PARALLEL_CHUNK_SIZE:
+            return self._calculate_in_parallel(competitor_ids, user_id, force_recalculate)
+        
+        # Aware UTC, so the stored last_calculated_at and the database's now()
+        # agree whatever the session TimeZone
+        now = datetime.now(timezone.utc)
         try:
-            # Check if recent calculation exists (within 24 hours)
+            # Cache-aside: in-process first, then Redis, recomputing entries
+            # picked for early refresh
+            pending_ids = list(competitor_ids)
+            refresh_ids = set()
             if not force_recalculate:
-                existing = self.db.query(TargIntel).filter(
-                    TargIntel.competitor_id == competitor_id,
-                    TargIntel.user_id == user_id,
-                    TargIntel.is_active == True,
-                    TargIntel.last_calculated_at >= datetime.utcnow() - timedelta(hours=24)
-                ).first()
+                remote_ids = []
+                for competitor_id in competitor_ids:
+                    cached_intel = _intel_local_cache.get(f"{user_id}:{competitor_id}")
+                    if cached_intel is not None:
+                        results[competitor_id] = cached_intel
+                    else:
+                        remote_ids.append(competitor_id)
                 
-                if existing:
-                    logger.info(f"Using cached targeting intel for competitor {competitor_id}")
-                    return existing
-            
-            # Get competitor
-            competitor = self.db.query(Competitor).filter(
-                Competitor.id == competitor_id,
-                Competitor.user_id == user_id
-            ).first()
-            
-            if not competitor:
-                logger.error(f"Competitor {competitor_id} not found or doesn't belong to user")
-                return None
-            
-            # Get latest metrics for this competitor
-            metrics = self.db.query(SurvMetrics).filter(
-                SurvMetrics.competitor_id == competitor_id
-            ).order_by(SurvMetrics.calculated_at.desc()).first()
-            
-            # Get ads for this competitor
-            ads = self.db.query(Ad).filter(
-                Ad.competitor_id == competitor_id,
-                Ad.is_active == True
-            ).all()
-            
-            if not metrics and not ads:
-                logger.warning(f"No metrics or ads found for competitor {competitor.name}")
-                # Still create basic intel with defaults
-                return self._create_basic_intel(competitor, user_id)
-            
-            # Calculate all metrics using surv_metrics data
-            age_data = self._calculate_age_targeting(metrics, ads, competitor)
-            gender_data = self._calculate_gender_targeting(metrics, ads, competitor)
-            geo_data = self._calculate_geography_targeting(metrics, ads, competitor)
-            interest_data = self._calculate_interest_clusters(metrics, ads, competitor)
-            income_data = self._calculate_income_level(metrics, ads, competitor)
-            device_data = self._calculate_device_targeting(metrics, ads)
-            funnel_data = self._calculate_funnel_stage(metrics, ads)
-            audience_data = self._calculate_audience_type(metrics, ads)
-            bidding_data = self._calculate_bidding_strategy(metrics, ads)
-            content_data = self._calculate_content_analysis(ads)
-            performance_data = self._calculate_performance_metrics(metrics)
-            
-            # Calculate confidence scores
-            confidence_scores = self._calculate_confidence_scores(
-                metrics, ads, age_data, gender_data, geo_data, 
-                interest_data, income_data, device_data, 
-                funnel_data, audience_data, bidding_data
-            )
+                pending_ids = []
+                cached = _intel_cache.get_many([f"{user_id}:{cid}" for cid in remote_ids])
+                for competitor_id, payload in zip(remote_ids, cached):
+                    if payload is None:
+                        pending_ids.append(competitor_id)
+                    elif _should_refresh_early(payload["cached_at"]):
+                        pending_ids.append(competitor_id)
+                        refresh_ids.add(competitor_id)
+                    else:
+                        results[competitor_id] = _intel_from_snapshot(payload["intel"])
+                        _intel_local_cache.set(f"{user_id}:{competitor_id}", results[competitor_id])
+                
+                if not pending_ids:
+                    return results
+            
+            # Existing intel rows, most recently calculated first per competitor,
+            # flagged when still fresh (within 24 hours). The window is computed
+            # by the database so the statement has no per-call parameter.
+            is_fresh = and_(
+                TargIntel.is_active == True,
+                TargIntel.last_calculated_at >= func.now() - text("interval '24 hours'")
+            ).label("is_fresh")
+            existing_by_competitor: Dict[UUID, TargIntel] = {}
+            fresh_ids = set()
+            for targ_intel, fresh in self.db.execute(
+                select(TargIntel, is_fresh).where(
+                    TargIntel.competitor_id.in_(pending_ids),
+                    TargIntel.user_id == user_id
+                ).order_by(TargIntel.last_calculated_at.desc().nulls_last())
+            ):
+                if targ_intel.competitor_id not in existing_by_competitor:
+                    existing_by_competitor[targ_intel.competitor_id] = targ_intel
+                    if fresh:
+                        fresh_ids.add(targ_intel.competitor_id)
+            
+            # Reuse recent calculations
+            if not force_recalculate:
+                remaining_ids = []
+                for competitor_id in pending_ids:
+                    if competitor_id in fresh_ids and competitor_id not in refresh_ids:
+                        logger.info("Using cached targeting intel for competitor %s", competitor_id)
+                        existing = existing_by_competitor[competitor_id]
+                        results[competitor_id] = existing
+                        self._cache_intel(existing, _epoch(existing.last_calculated_at))
+                    else:
+                        remaining_ids.append(competitor_id)
+                pending_ids = remaining_ids
+                
+                if not pending_ids:
+                    return results
+            
+            # Latest metrics row per competitor
+            ranked_metrics = select(
+                SurvMetrics.id,
+                func.row_number().over(
+                    partition_by=SurvMetrics.competitor_id,
+                    order_by=SurvMetrics.calculated_at.desc()
+                ).label("rn")
+            ).where(SurvMetrics.competitor_id.in_(pending_ids)).subquery()
+            latest_metrics_ids = select(ranked_metrics.c.id).where(ranked_metrics.c.rn == 1)
+            
+            # Plain entity selects: the caller's session may already hold these
+            # competitors, so their relationship collections are left untouched
+            competitors = {
+                competitor.id: competitor
+                for competitor in self.db.scalars(
+                    select(Competitor).where(
+                        Competitor.id.in_(pending_ids),
+                        Competitor.user_id == user_id
+                    )
+                )
+            }
+            latest_metrics = {
+                metrics.competitor_id: metrics
+                for metrics in self.db.scalars(
+                    select(SurvMetrics).where(SurvMetrics.id.in_(latest_metrics_ids))
+                )
+            }
+            active_ads: Dict[UUID, List[Ad]] = defaultdict(list)
+            for ad in self.db.scalars(
+                select(Ad).where(Ad.competitor_id.in_(pending_ids), Ad.is_active == True)
+            ):
+                active_ads[ad.competitor_id].append(ad)
+            
+            unchanged_ids: List[UUID] = []
+            rows: List[Dict[str, Any]] = []
+            for competitor_id in pending_ids:
+                competitor = competitors.get(competitor_id)
+                if not competitor:
+                    logger.error("Competitor %s not found or doesn't belong to user", competitor_id)
+                    continue
+                
+                try:
+                    values = self._calculate_intel(
+                        competitor,
+                        latest_metrics.get(competitor_id),
+                        active_ads.get(competitor_id, [])
+                    )
+                except Exception as e:
+                    logger.error("Error calculating targeting intel for competitor %s: %s", competitor_id, e, exc_info=True)
+                    continue
+                
+                existing = existing_by_competitor.get(competitor_id)
+                if existing and existing.content_hash == values["content_hash"]:
+                    # Same result as the stored row; only mark it fresh
+                    logger.info("Targeting intel unchanged for %s", competitor.name)
+                    unchanged_ids.append(existing.id)
+                    continue
+                
+                if values["raw_analysis"] is not None:
+                    # ISO-formatted by the JSON serializer; kept out of the content hash
+                    values["raw_analysis"]["calculation_timestamp"] = now
+                rows.append({
+                    "competitor_id": competitor_id,
+                    "user_id": user_id,
+                    **values,
+                    "last_calculated_at": now,
+                    "is_active": True,
+                })
+            
+            calculated: List[TargIntel] = []
+            if unchanged_ids:
+                calculated.extend(self._touch_intel(unchanged_ids, now))
+            if rows:
+                calculated.extend(self._upsert_intel(rows))
+            for targ_intel in calculated:
+                results[targ_intel.competitor_id] = targ_intel
+            
+            # RETURNING already loaded every column; detach the rows so the
+            # commit does not expire them and force a reload per row
+            for targ_intel in results.values():
+                if targ_intel is not None and targ_intel in self.db:
+                    self.db.expunge(targ_intel)
             
-            overall_confidence = sum(confidence_scores.values()) / len(confidence_scores)
+            self.db.commit()
+            cached_at = time.time()
+            for targ_intel in calculated:
+                self._cache_intel(targ_intel, cached_at)
             
-            # Create or update TargIntel record
-            targ_intel = self.db.query(TargIntel).filter(
-                TargIntel.competitor_id == competitor_id,
-                TargIntel.user_id == user_id
-            ).first()
-            
-            if not targ_intel:
-                targ_intel = TargIntel(
-                    competitor_id=competitor_id,
-                    user_id=user_id
-                )
-                self.db.add(targ_intel)
-            
-            # Update fields
-            targ_intel.age_min = age_data.get("min_age")
-            targ_intel.age_max = age_data.get("max_age")
-            targ_intel.age_range = age_data.get("range")
-            targ_intel.gender_ratio = gender_data.get("ratio")
-            targ_intel.primary_gender = gender_data.get("primary")
-            targ_intel.geography = geo_data.get("locations")
-            targ_intel.primary_location = geo_data.get("primary_location")
-            targ_intel.interest_clusters = interest_data.get("clusters")
-            targ_intel.primary_interests = interest_data.get("primary_interests")
-            targ_intel.income_level = income_data.get("level")
-            targ_intel.income_score = income_data.get("score")
-            targ_intel.device_distribution = device_data.get("distribution")
-            targ_intel.primary_device = device_data.get("primary")
-            targ_intel.funnel_stage = funnel_data.get("stage")
-            targ_intel.funnel_score = funnel_data.get("score")
-            targ_intel.audience_type = audience_data.get("type")
-            targ_intel.audience_size = audience_data.get("size")
-            targ_intel.bidding_strategy = bidding_data.get("strategy")
-            targ_intel.bidding_confidence = bidding_data.get("confidence")
-            targ_intel.content_type = content_data.get("type")
-            targ_intel.call_to_action = content_data.get("cta")
-            targ_intel.estimated_cpm = performance_data.get("cpm")
-            targ_intel.estimated_cpc = performance_data.get("cpc")
-            targ_intel.estimated_roas = performance_data.get("roas")
-            targ_intel.engagement_rate = performance_data.get("engagement_rate")
-            targ_intel.confidence_scores = confidence_scores
-            targ_intel.overall_confidence = overall_confidence
-            targ_intel.last_calculated_at = datetime.utcnow()
-            targ_intel.is_active = True
+            return results
             
+        except Exception as e:
+            logger.error("Error calculating targeting intel for competitors %s: %s", competitor_ids, e, exc_info=True)
+            self.db.rollback()
+            return {cid: None for cid in competitor_ids}
+    
+    @staticmethod
+    def _calculate_in_parallel(competitor_ids: List[UUID], user_id: UUID,
+                               force_recalculate: bool) -> Dict[UUID, Optional[IntelResult]]:
+        """
+        Run calculate_for_competitors over chunks of a large batch in a thread pool.
+        
+        Each worker opens its own session, so DB round-trips for different
+        chunks overlap. Returned rows are detached from those sessions with
+        their columns already loaded.
+        """
+        def calculate_chunk(chunk: List[UUID]) -> Dict[UUID, Optional[IntelResult]]:
+            with SessionLocal() as db:
+                return TargIntelCalculator(db).calculate_for_competitors(chunk, user_id, force_recalculate)
+        
+        chunks = [
+            competitor_ids[start:start + _PARALLEL_CHUNK_SIZE]
+            for start in range(0, len(competitor_ids), _PARALLEL_CHUNK_SIZE)
+        ]
+        results: Dict[UUID, Optional[IntelResult]] = {}
+        with ThreadPoolExecutor(max_workers=min(_PARALLEL_MAX_WORKERS, len(chunks))) as executor:
+            for chunk_results in executor.map(calculate_chunk, chunks):
+                results.update(chunk_results)
+        return results
+    
+    def _cache_intel(self, targ_intel: TargIntel, cached_at: float) -> None:
+        """Write a TargIntel snapshot to both cache tiers for the rest of its 24-hour lifetime"""
+        ttl = int(_INTEL_TTL_SECONDS - (time.time() - cached_at))
+        if ttl <= 0:
+            return
+        cache_key = f"{targ_intel.user_id}:{targ_intel.competitor_id}"
+        snapshot = _intel_snapshot(targ_intel)
+        _intel_local_cache.set(cache_key, CachedTargIntel(**snapshot), ttl=min(ttl, _intel_local_cache.ttl))
+        _intel_cache.set(cache_key, {"cached_at": cached_at, "intel": snapshot}, ttl=ttl)
+    
+    def _touch_intel(self, intel_ids: List[UUID], now: datetime) -> List[TargIntel]:
+        """Mark unchanged TargIntel rows as freshly calculated in one statement"""
+        stmt = (
+            update(TargIntel)
+            .where(TargIntel.id.in_(intel_ids))
+            .values(last_calculated_at=now, is_active=True, updated_at=func.now())
+            .returning(TargIntel)
+        )
+        return self.db.scalars(stmt, execution_options={"populate_existing": True}).all()
+    
+    def _upsert_intel(self, rows: List[Dict[str, Any]]) -> List[TargIntel]:
+        """Insert or update TargIntel rows on (competitor_id, user_id) in one statement"""
+        stmt = insert(TargIntel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TargIntel.competitor_id, TargIntel.user_id],
+            set_={
+                **{key: stmt.excluded[key] for key in rows[0] if key not in ("competitor_id", "user_id")},
+                "updated_at": func.now(),
+            }
+        ).returning(TargIntel)
+        return self.db.scalars(stmt, execution_options={"populate_existing": True}).all()
+    
+    def _calculate_intel(self, competitor: Competitor, metrics: Optional[SurvMetrics],
+                         ads: List[Ad]) -> Dict[str, Any]:
+        """Calculate TargIntel column values for one competitor, with their content hash"""
+        if not metrics and not ads:
+            logger.warning("No metrics or ads found for competitor %s", competitor.name)
+            # Still create basic intel with defaults
+            return self._create_basic_intel(competitor)
+        
+        # Calculate all metrics using surv_metrics data
+        # Scan ad text once and share the matches between extractors
+        index = self._build_text_index(competitor, ads)
+        
+        age_data = self._calculate_age_targeting(metrics, index)
+        gender_data = self._calculate_gender_targeting(metrics, index)
+        geo_data = self._calculate_geography_targeting(metrics, ads, competitor)
+        interest_data = self._calculate_interest_clusters(metrics, index, competitor)
+        income_data = self._calculate_income_level(metrics, index, competitor)
+        device_data = self._calculate_device_targeting(metrics, ads)
+        funnel_data = self._calculate_funnel_stage(metrics, ads, index)
+        audience_data = self._calculate_audience_type(metrics, ads, index)
+        bidding_data = self._calculate_bidding_strategy(metrics, index)
+        content_data = self._calculate_content_analysis(ads, index)
+        performance_data = self._calculate_performance_metrics(metrics)
+        
+        # Calculate confidence scores
+        confidence_scores = self._calculate_confidence_scores(
+            metrics, ads, age_data, gender_data, geo_data, 
+            interest_data, income_data, device_data, 
+            funnel_data, audience_data, bidding_data
+        )
+        
+        overall_confidence = sum(confidence_scores.values()) / len(confidence_scores)
+        
+        values = {
+            "age_min": age_data.get("min_age"),
+            "age_max": age_data.get("max_age"),
+            "age_range": age_data.get("range"),
+            "gender_ratio": gender_data.get("ratio"),
+            "primary_gender": gender_data.get("primary"),
+            "geography": geo_data.get("locations"),
+            "primary_location": geo_data.get("primary_location"),
+            "interest_clusters": interest_data.get("clusters"),
+            "primary_interests": interest_data.get("primary_interests"),
+            "income_level": income_data.get("level"),
+            "income_score": income_data.get("score"),
+            "device_distribution": device_data.get("distribution"),
+            "primary_device": device_data.get("primary"),
+            "funnel_stage": funnel_data.get("stage"),
+            "funnel_score": funnel_data.get("score"),
+            "audience_type": audience_data.get("type"),
+            "audience_size": audience_data.get("size"),
+            "bidding_strategy": bidding_data.get("strategy"),
+            "bidding_confidence": bidding_data.get("confidence"),
+            "content_type": content_data.get("type"),
+            "call_to_action": content_data.get("cta"),
+            "estimated_cpm": performance_data.get("cpm"),
+            "estimated_cpc": performance_data.get("cpc"),
+            "estimated_roas": performance_data.get("roas"),
+            "engagement_rate": performance_data.get("engagement_rate"),
+            "confidence_scores": confidence_scores,
+            "overall_confidence": overall_confidence,
             # Store raw analysis for debugging
-            raw_analysis = {
+            "raw_analysis": {
                 "metrics_available": bool(metrics),
                 "ads_count": len(ads),
-                "calculation_timestamp": datetime.utcnow().isoformat(),
                 "metrics_used": self._get_metrics_used(metrics),
                 "age_data": age_data,
                 "gender_data": gender_data,
                 "geo_data": geo_data,
-            }
-            targ_intel.raw_analysis = raw_analysis
-            
-            self.db.commit()
-            self.db.refresh(targ_intel)
-            
-            logger.info(f"Calculated targeting intel for {competitor.name} with confidence {overall_confidence:.2f}")
-            return targ_intel
-            
-        except Exception as e:
-            logger.error(f"Error calculating targeting intel for competitor {competitor_id}: {e}", exc_info=True)
-            self.db.rollback()
-            return None
+            },
+        }
+        values["content_hash"] = _content_hash(values)
+        
+        logger.info("Calculated targeting intel for %s with confidence %.2f", competitor.name, overall_confidence)
+        return values
+    
+    def _build_text_index(self, competitor: Competitor, ads: List[Ad]) -> TextIndex:
+        """Match keywords against the competitor name and every ad once for the text-based extractors"""
+        description_keywords = []
+        description_counts = Counter()
+        copy_counts = Counter()
+        ad_keywords = []
+        
+        for ad in ads:
+            found_description, found_copy, found_all = _ad_keywords_in(
+                ad.headline.lower() if ad.headline else "",
+                ad.description.lower() if ad.description else "",
+                ad.full_text.lower() if ad.full_text else ""
+            )
+            description_keywords.append(found_description)
+            description_counts.update(found_description)
+            copy_counts.update(found_copy)
+            ad_keywords.append(found_all)
+        
+        name_keywords = _keywords_in(competitor.name.lower()) if competitor.name else frozenset()
+        return TextIndex(name_keywords, description_keywords, description_counts, copy_counts, ad_keywords)
     
     def _get_metrics_used(self, metrics: SurvMetrics) -> Dict:
         """Get which metrics were available for calculation"""
@@ -199,8 +874,7 @@ class TargIntelCalculator:
         
         return used
     
-    def _calculate_age_targeting(self, metrics: SurvMetrics, ads: List[Ad], 
-                               competitor: Competitor) -> Dict[str, Any]:
+    def _calculate_age_targeting(self, metrics: SurvMetrics, index: TextIndex) -> Dict[str, Any]:
         """Calculate age targeting from metrics and ads"""
         try:
             # Try to extract from audience_clusters first
@@ -213,12 +887,12 @@ class TargIntelCalculator:
                         return self._process_age_patterns(age_patterns)
             
             # Try to extract from ad content as fallback
-            age_data = self._extract_age_from_ads(ads)
+            age_data = self._extract_age_from_ads(index)
             if age_data:
                 return age_data
             
             # Try to infer from competitor name/industry
-            inferred_age = self._infer_age_from_competitor(competitor)
+            inferred_age = self._infer_age_from_competitor(index)
             if inferred_age:
                 return inferred_age
             
@@ -231,7 +905,7 @@ class TargIntelCalculator:
             }
             
         except Exception as e:
-            logger.warning(f"Error in age calculation: {e}")
+            logger.warning("Error in age calculation: %s", e)
             return {
                 "min_age": 25,
                 "max_age": 34,
@@ -243,63 +917,35 @@ class TargIntelCalculator:
         """Extract age patterns from audience clusters"""
         age_patterns = []
         
-        # Common age-related keywords in clusters
-        age_keywords = {
-            'teen': '18-24', 'teenager': '18-24', 'college': '18-24', 'student': '18-24',
-            'young': '18-34', 'youth': '18-34', 'millennial': '25-40',
-            'adult': '25-54', 'professional': '25-54', 'working': '25-54',
-            'middle': '35-54', 'family': '25-44', 'parent': '25-44',
-            'senior': '55+', 'retired': '55+', 'retirement': '55+'
-        }
-        
         if isinstance(audience_clusters, dict):
-            for key, value in audience_clusters.items():
-                key_lower = str(key).lower()
-                for keyword, age_range in age_keywords.items():
-                    if keyword in key_lower:
+            for key in audience_clusters:
+                found = _keywords_in(str(key).lower())
+                for keyword, age_range in _CLUSTER_AGE_KEYWORDS.items():
+                    if keyword in found:
                         age_patterns.append(age_range)
         
         return age_patterns
     
-    def _extract_age_from_ads(self, ads: List[Ad]) -> Optional[Dict]:
+    def _extract_age_from_ads(self, index: TextIndex) -> Optional[Dict]:
         """Extract age targeting from ad content"""
-        age_keywords = {
-            "teen": 13, "teenager": 13, "college": 18, "university": 18,
-            "young": 18, "youth": 18, "adult": 25, "professional": 30,
-            "middle": 40, "senior": 55, "retirement": 60, "family": 35
-        }
-        
-        age_data = []
-        for ad in ads:
-            if ad.description:
-                text = ad.description.lower()
-                for keyword, age in age_keywords.items():
-                    if keyword in text:
-                        age_data.append(age)
+        counts = index.description_counts
+        age_data = [
+            age
+            for keyword, age in _AD_AGE_KEYWORDS.items()
+            for _ in range(counts[keyword])
+        ]
         
         if age_data:
             return self._process_age_data(age_data)
         
         return None
     
-    def _infer_age_from_competitor(self, competitor: Competitor) -> Optional[Dict]:
-        """Infer age targeting from competitor information"""
-        if not competitor.name:
-            return None
-        
-        name = competitor.name.lower()
-        domain = competitor.domain.lower() if competitor.domain else ""
-        industry = competitor.industry.lower() if competitor.industry else ""
-        
-        # Age patterns based on industry/name
-        if any(word in name for word in ["kid", "child", "toy", "baby", "toddler"]):
-            return {"min_age": 0, "max_age": 12, "range": "0-12", "confidence": 0.6}
-        elif any(word in name for word in ["teen", "youth", "college", "student"]):
-            return {"min_age": 13, "max_age": 24, "range": "13-24", "confidence": 0.6}
-        elif any(word in name for word in ["luxury", "premium", "wealth", "elite"]):
-            return {"min_age": 35, "max_age": 65, "range": "35-65", "confidence": 0.5}
-        elif any(word in name for word in ["retirement", "senior", "elder"]):
-            return {"min_age": 55, "max_age": 75, "range": "55+", "confidence": 0.7}
+    def _infer_age_from_competitor(self, index: TextIndex) -> Optional[Dict]:
+        """Infer age targeting from the competitor name"""
+        # Age patterns based on name
+        for words, age_data in _NAME_AGE_RULES:
+            if not index.name_keywords.isdisjoint(words):
+                return dict(age_data)
         
         return None
     
@@ -308,28 +954,36 @@ class TargIntelCalculator:
         if not age_data:
             return self.DEFAULT_VALUES["age_range"]
         
-        min_age = min(age_data)
-        max_age = max(age_data)
-        
-        # Group into standard ranges
-        age_ranges = {
-            "18-24": 0, "25-34": 0, "35-44": 0, 
-            "45-54": 0, "55+": 0
-        }
-        
-        for age in age_data:
-            if 18 <= age <= 24:
-                age_ranges["18-24"] += 1
-            elif 25 <= age <= 34:
-                age_ranges["25-34"] += 1
-            elif 35 <= age <= 44:
-                age_ranges["35-44"] += 1
-            elif 45 <= age <= 54:
-                age_ranges["45-54"] += 1
-            elif age >= 55:
-                age_ranges["55+"] += 1
-        
-        primary_range = max(age_ranges, key=age_ranges.get)
+        if len(age_data) >= _AGE_NUMPY_MIN_SIZE:
+            # Bucket with numpy; index 0 holds ages under 18, which aren't counted
+            ages = np.asarray(age_data, dtype=np.int16)
+            counts = np.bincount(np.digitize(ages, _AGE_BIN_EDGES), minlength=len(_AGE_RANGE_LABELS) + 1)
+            primary_range = _AGE_RANGE_LABELS[int(counts[1:].argmax())]
+            min_age = int(ages.min())
+            max_age = int(ages.max())
+        else:
+            min_age = min(age_data)
+            max_age = max(age_data)
+            
+            # Group into standard ranges
+            age_ranges = {
+                "18-24": 0, "25-34": 0, "35-44": 0, 
+                "45-54": 0, "55+": 0
+            }
+            
+            for age in age_data:
+                if 18 <= age <= 24:
+                    age_ranges["18-24"] += 1
+                elif 25 <= age <= 34:
+                    age_ranges["25-34"] += 1
+                elif 35 <= age <= 44:
+                    age_ranges["35-44"] += 1
+                elif 45 <= age <= 54:
+                    age_ranges["45-54"] += 1
+                elif age >= 55:
+                    age_ranges["55+"] += 1
+            
+            primary_range = max(age_ranges.items(), key=itemgetter(1))[0]
         confidence = min(len(age_data) / 5, 1.0)
         
         return {
@@ -351,7 +1005,7 @@ class TargIntelCalculator:
         
         # Count patterns
         pattern_counts = Counter(age_patterns)
-        most_common = pattern_counts.most_common(1)[0][0]
+        most_common = max(pattern_counts.items(), key=itemgetter(1))[0]
         
         # Convert range string to min/max
         if "-" in most_common:
@@ -371,8 +1025,7 @@ class TargIntelCalculator:
             "confidence": confidence
         }
     
-    def _calculate_gender_targeting(self, metrics: SurvMetrics, ads: List[Ad], 
-                                  competitor: Competitor) -> Dict[str, Any]:
+    def _calculate_gender_targeting(self, metrics: SurvMetrics, index: TextIndex) -> Dict[str, Any]:
         """Calculate gender targeting from metrics and ads"""
         try:
             # Try to extract from audience_clusters first
@@ -384,43 +1037,40 @@ class TargIntelCalculator:
                         return gender_data
             
             # Try to extract from ad content
-            gender_data = self._extract_gender_from_ads(ads)
+            gender_data = self._extract_gender_from_ads(index)
             if gender_data:
                 return gender_data
             
             # Try to infer from competitor
-            inferred_gender = self._infer_gender_from_competitor(competitor)
+            inferred_gender = self._infer_gender_from_competitor(index)
             if inferred_gender:
                 return inferred_gender
             
             # Default fallback
             return {
-                "ratio": self.DEFAULT_VALUES["gender_ratio"],
+                "ratio": dict(self.DEFAULT_VALUES["gender_ratio"]),
                 "primary": self.DEFAULT_VALUES["primary_gender"],
                 "confidence": 0.3
             }
             
         except Exception as e:
-            logger.warning(f"Error in gender calculation: {e}")
+            logger.warning("Error in gender calculation: %s", e)
             return {
-                "ratio": self.DEFAULT_VALUES["gender_ratio"],
+                "ratio": dict(self.DEFAULT_VALUES["gender_ratio"]),
                 "primary": self.DEFAULT_VALUES["primary_gender"],
                 "confidence": 0.1
             }
     
     def _extract_gender_from_clusters(self, audience_clusters: Dict) -> Optional[Dict]:
         """Extract gender patterns from audience clusters"""
-        male_keywords = ["male", "men", "guy", "father", "dad", "brother", "boy"]
-        female_keywords = ["female", "women", "girl", "mother", "mom", "sister", "girl"]
-        
         male_count = 0
         female_count = 0
         
         if isinstance(audience_clusters, dict):
-            for key, value in audience_clusters.items():
-                key_lower = str(key).lower()
-                male_count += sum(1 for kw in male_keywords if kw in key_lower)
-                female_count += sum(1 for kw in female_keywords if kw in key_lower)
+            for key in audience_clusters:
+                found = _keywords_in(str(key).lower())
+                male_count += sum(map(found.__contains__, _CLUSTER_MALE_KEYWORDS))
+                female_count += sum(map(found.__contains__, _CLUSTER_FEMALE_KEYWORDS))
         
         if male_count > 0 or female_count > 0:
             total = male_count + female_count
@@ -447,19 +1097,11 @@ class TargIntelCalculator:
         
         return None
     
-    def _extract_gender_from_ads(self, ads: List[Ad]) -> Optional[Dict]:
+    def _extract_gender_from_ads(self, index: TextIndex) -> Optional[Dict]:
         """Extract gender targeting from ad content"""
-        male_keywords = ["men", "male", "guy", "father", "dad", "brother", "son", "he", "him", "his"]
-        female_keywords = ["women", "female", "girl", "lady", "mother", "mom", "sister", "daughter", "she", "her", "hers"]
-        
-        male_count = 0
-        female_count = 0
-        
-        for ad in ads:
-            if ad.description:
-                text = ad.description.lower()
-                male_count += sum(1 for kw in male_keywords if kw in text)
-                female_count += sum(1 for kw in female_keywords if kw in text)
+        counts = index.description_counts
+        male_count = sum(map(counts.__getitem__, _AD_MALE_KEYWORDS))
+        female_count = sum(map(counts.__getitem__, _AD_FEMALE_KEYWORDS))
         
         if male_count > 0 or female_count > 0:
             total = male_count + female_count
@@ -486,22 +1128,18 @@ class TargIntelCalculator:
         
         return None
     
-    def _infer_gender_from_competitor(self, competitor: Competitor) -> Optional[Dict]:
-        """Infer gender targeting from competitor information"""
-        if not competitor.name:
-            return None
+    def _infer_gender_from_competitor(self, index: TextIndex) -> Optional[Dict]:
+        """Infer gender targeting from the competitor name"""
+        found = index.name_keywords
         
-        name = competitor.name.lower()
-        industry = competitor.industry.lower() if competitor.industry else ""
-        
-        # Gender patterns based on industry
-        if any(word in name for word in ["men", "groom", "shave", "barber", "male"]):
+        # Gender patterns based on name
+        if not found.isdisjoint(_NAME_MALE_KEYWORDS):
             return {
                 "ratio": {"male": 0.8, "female": 0.2, "other": 0.0},
                 "primary": "male",
                 "confidence": 0.7
             }
-        elif any(word in name for word in ["women", "beauty", "cosmetic", "makeup", "female"]):
+        elif not found.isdisjoint(_NAME_FEMALE_KEYWORDS):
             return {
                 "ratio": {"male": 0.2, "female": 0.8, "other": 0.0},
                 "primary": "female",
@@ -541,15 +1179,15 @@ class TargIntelCalculator:
             
             # Default fallback
             return {
-                "locations": self.DEFAULT_VALUES["geography"],
+                "locations": self._default_geography(),
                 "primary_location": self.DEFAULT_VALUES["primary_location"],
                 "confidence": 0.3
             }
             
         except Exception as e:
-            logger.warning(f"Error in geography calculation: {e}")
+            logger.warning("Error in geography calculation: %s", e)
             return {
-                "locations": self.DEFAULT_VALUES["geography"],
+                "locations": self._default_geography(),
                 "primary_location": self.DEFAULT_VALUES["primary_location"],
                 "confidence": 0.1
             }
@@ -582,43 +1220,19 @@ class TargIntelCalculator:
                                         locations["states"].append(parts[1].strip())
         
         except Exception as e:
-            logger.warning(f"Error extracting locations from geo data: {e}")
+            logger.warning("Error extracting locations from geo data: %s", e)
         
         # Deduplicate and limit
-        locations["countries"] = list(set(locations["countries"]))[:10]
-        locations["states"] = list(set(locations["states"]))[:10]
-        locations["cities"] = list(set(locations["cities"]))[:10]
+        # Deduplicate in first-seen order so results (and their content hash) are stable
+        locations["countries"] = list(dict.fromkeys(locations["countries"]))[:10]
+        locations["states"] = list(dict.fromkeys(locations["states"]))[:10]
+        locations["cities"] = list(dict.fromkeys(locations["cities"]))[:10]
         
         return locations
     
     def _extract_locations_from_domain(self, domain: str) -> Dict:
         """Extract locations from domain name"""
-        locations = {"countries": [], "states": [], "cities": []}
-        
-        # Country TLDs
-        country_tlds = {
-            ".com": "US", ".org": "US", ".net": "US",
-            ".uk": "UK", ".co.uk": "UK",
-            ".ca": "Canada",
-            ".au": "Australia",
-            ".de": "Germany",
-            ".fr": "France",
-            ".jp": "Japan",
-            ".cn": "China",
-            ".in": "India",
-            ".br": "Brazil",
-            ".mx": "Mexico",
-        }
-        
-        for tld, country in country_tlds.items():
-            if tld in domain.lower():
-                locations["countries"].append(country)
-                break
-        
-        if not locations["countries"]:
-            locations["countries"].append("US")  # Default
-        
-        return locations
+        return {"countries": [_country_for_domain(domain)], "states": [], "cities": []}
     
     def _get_primary_location(self, locations: Dict) -> str:
         """Get primary location from locations dict"""
@@ -626,7 +1240,7 @@ class TargIntelCalculator:
             return locations["countries"][0]
         return self.DEFAULT_VALUES["primary_location"]
     
-    def _calculate_interest_clusters(self, metrics: SurvMetrics, ads: List[Ad], 
+    def _calculate_interest_clusters(self, metrics: SurvMetrics, index: TextIndex, 
                                    competitor: Competitor) -> Dict[str, Any]:
         """Calculate interest clusters from ad content and metrics"""
         try:
@@ -639,10 +1253,10 @@ class TargIntelCalculator:
                     interests.extend(self._extract_interests_from_clusters(audience_data))
             
             # Extract from ad content
-            interests.extend(self._extract_interests_from_ads(ads))
+            interests.extend(self._extract_interests_from_ads(index))
             
             # Extract from competitor info
-            interests.extend(self._extract_interests_from_competitor(competitor))
+            interests.extend(self._extract_interests_from_competitor(index))
             
             if interests:
                 # Get top interests
@@ -652,7 +1266,7 @@ class TargIntelCalculator:
                 confidence = min(len(set(interests)) / 5, 1.0)
                 
                 return {
-                    "clusters": list(set(interests)),
+                    "clusters": list(dict.fromkeys(interests)),
                     "primary_interests": top_interests,
                     "confidence": confidence
                 }
@@ -665,7 +1279,7 @@ class TargIntelCalculator:
             }
             
         except Exception as e:
-            logger.warning(f"Error in interest calculation: {e}")
+            logger.warning("Error in interest calculation: %s", e)
             return {
                 "clusters": ["technology", "business"],
                 "primary_interests": ["technology", "business"],
@@ -676,90 +1290,35 @@ class TargIntelCalculator:
         """Extract interests from audience clusters"""
         interests = []
         
-        # Map cluster names to interest categories
-        interest_mapping = {
-            "fitness": ["fitness", "workout", "gym", "exercise", "health", "wellness"],
-            "technology": ["tech", "software", "app", "digital", "coding", "programming"],
-            "fashion": ["fashion", "style", "clothing", "wear", "outfit", "apparel"],
-            "travel": ["travel", "vacation", "tour", "destination", "hotel"],
-            "food": ["food", "restaurant", "recipe", "cooking", "meal", "dining"],
-            "finance": ["finance", "investment", "banking", "money", "stock"],
-            "education": ["education", "learning", "course", "study", "school"],
-            "entertainment": ["entertainment", "movie", "music", "game", "streaming"],
-            "sports": ["sports", "athletic", "game", "team", "player"],
-            "business": ["business", "enterprise", "corporate", "office", "work"],
-            "luxury": ["luxury", "premium", "exclusive", "high-end", "designer"]
-        }
-        
         if isinstance(audience_clusters, dict):
-            for key, value in audience_clusters.items():
-                key_lower = str(key).lower()
-                for category, keywords in interest_mapping.items():
-                    if any(keyword in key_lower for keyword in keywords):
+            for key in audience_clusters:
+                found = _keywords_in(str(key).lower())
+                for category, keywords in _CLUSTER_INTEREST_MAPPING.items():
+                    if not found.isdisjoint(keywords):
                         interests.append(category)
         
         return interests
     
-    def _extract_interests_from_ads(self, ads: List[Ad]) -> List[str]:
+    def _extract_interests_from_ads(self, index: TextIndex) -> List[str]:
         """Extract interests from ad content"""
         interests = []
         
-        interest_mapping = {
-            "fitness": ["fitness", "workout", "exercise", "gym", "health", "wellness"],
-            "technology": ["tech", "gadget", "software", "app", "digital", "innovation"],
-            "fashion": ["fashion", "clothing", "style", "wear", "outfit", "apparel"],
-            "travel": ["travel", "vacation", "tour", "destination", "hotel", "flight"],
-            "food": ["food", "restaurant", "recipe", "cooking", "meal", "dining"],
-            "finance": ["finance", "investment", "banking", "money", "saving", "wealth"],
-            "education": ["education", "learning", "course", "study", "school", "university"],
-            "entertainment": ["entertainment", "movie", "music", "game", "streaming", "fun"],
-            "sports": ["sports", "athletic", "game", "team", "player", "competition"],
-            "business": ["business", "enterprise", "corporate", "office", "professional", "work"],
-            "luxury": ["luxury", "premium", "exclusive", "high-end", "elite", "designer"]
-        }
-        
-        for ad in ads:
-            text = ""
-            if ad.headline:
-                text += " " + ad.headline.lower()
-            if ad.description:
-                text += " " + ad.description.lower()
-            if ad.full_text:
-                text += " " + ad.full_text.lower()
-            
-            for category, keywords in interest_mapping.items():
-                if any(keyword in text for keyword in keywords):
+        for found in index.ad_keywords:
+            for category, keywords in _AD_INTEREST_MAPPING.items():
+                if not found.isdisjoint(keywords):
                     interests.append(category)
         
         return interests
     
-    def _extract_interests_from_competitor(self, competitor: Competitor) -> List[str]:
-        """Extract interests from competitor information"""
-        interests = []
-        
-        if competitor.name:
-            name = competitor.name.lower()
-            
-            if any(word in name for word in ["tech", "software", "app", "digital", "cloud"]):
-                interests.append("technology")
-            if any(word in name for word in ["fit", "gym", "health", "wellness", "exercise"]):
-                interests.append("fitness")
-            if any(word in name for word in ["style", "wear", "fashion", "clothing", "apparel"]):
-                interests.append("fashion")
-            if any(word in name for word in ["travel", "tour", "hotel", "flight", "vacation"]):
-                interests.append("travel")
-            if any(word in name for word in ["food", "restaurant", "cafe", "kitchen", "meal"]):
-                interests.append("food")
-            if any(word in name for word in ["bank", "finance", "money", "capital", "investment"]):
-                interests.append("finance")
-            if any(word in name for word in ["edu", "learn", "school", "academy", "course"]):
-                interests.append("education")
-            if any(word in name for word in ["luxury", "premium", "exclusive", "elite"]):
-                interests.append("luxury")
-        
-        return interests
+    def _extract_interests_from_competitor(self, index: TextIndex) -> List[str]:
+        """Extract interests from the competitor name"""
+        return [
+            category
+            for category, keywords in _NAME_INTEREST_MAPPING.items()
+            if not index.name_keywords.isdisjoint(keywords)
+        ]
     
-    def _calculate_income_level(self, metrics: SurvMetrics, ads: List[Ad], 
+    def _calculate_income_level(self, metrics: SurvMetrics, index: TextIndex, 
                               competitor: Competitor) -> Dict[str, Any]:
         """Infer income level from ad content and competitor data"""
         try:
@@ -793,12 +1352,12 @@ class TargIntelCalculator:
                 }
             
             # Try to infer from ad content
-            income_data = self._extract_income_from_ads(ads)
+            income_data = self._extract_income_from_ads(index)
             if income_data:
                 return income_data
             
             # Try to infer from competitor
-            inferred_income = self._infer_income_from_competitor(competitor)
+            inferred_income = self._infer_income_from_competitor(competitor, index)
             if inferred_income:
                 return inferred_income
             
@@ -810,32 +1369,18 @@ class TargIntelCalculator:
             }
             
         except Exception as e:
-            logger.warning(f"Error in income calculation: {e}")
+            logger.warning("Error in income calculation: %s", e)
             return {
                 "level": self.DEFAULT_VALUES["income_level"],
                 "score": self.DEFAULT_VALUES["income_score"],
                 "confidence": 0.1
             }
     
-    def _extract_income_from_ads(self, ads: List[Ad]) -> Optional[Dict]:
+    def _extract_income_from_ads(self, index: TextIndex) -> Optional[Dict]:
         """Extract income level from ad content"""
-        luxury_keywords = ["luxury", "premium", "exclusive", "high-end", "designer", 
-                         "bespoke", "custom", "elite", "prestigious", "expensive"]
-        affordable_keywords = ["affordable", "budget", "cheap", "discount", "sale", 
-                             "value", "economical", "low-cost", "bargain"]
-        
-        luxury_count = 0
-        affordable_count = 0
-        
-        for ad in ads:
-            text = ""
-            if ad.headline:
-                text += " " + ad.headline.lower()
-            if ad.description:
-                text += " " + ad.description.lower()
-            
-            luxury_count += sum(1 for kw in luxury_keywords if kw in text)
-            affordable_count += sum(1 for kw in affordable_keywords if kw in text)
+        counts = index.copy_counts
+        luxury_count = sum(map(counts.__getitem__, _AD_INCOME_KEYWORDS["luxury"]))
+        affordable_count = sum(map(counts.__getitem__, _AD_INCOME_KEYWORDS["affordable"]))
         
         if luxury_count > 0 or affordable_count > 0:
             if luxury_count > affordable_count:
@@ -859,28 +1404,17 @@ class TargIntelCalculator:
         
         return None
     
-    def _infer_income_from_competitor(self, competitor: Competitor) -> Optional[Dict]:
+    def _infer_income_from_competitor(self, competitor: Competitor, index: TextIndex) -> Optional[Dict]:
         """Infer income level from competitor information"""
         if not competitor.name:
             return None
         
-        name = competitor.name.lower()
-        industry = competitor.industry.lower() if competitor.industry else ""
+        # Income patterns based on name, then industry
+        for words, income_data in _NAME_INCOME_RULES:
+            if not index.name_keywords.isdisjoint(words):
+                return dict(income_data)
         
-        # Income patterns based on industry/name
-        if any(word in name for word in ["luxury", "premium", "exclusive", "designer", "elite"]):
-            return {
-                "level": "luxury",
-                "score": 0.9,
-                "confidence": 0.7
-            }
-        elif any(word in name for word in ["discount", "budget", "cheap", "value", "affordable"]):
-            return {
-                "level": "low",
-                "score": 0.3,
-                "confidence": 0.7
-            }
-        elif any(word in industry for word in ["finance", "banking", "investment", "consulting"]):
+        if competitor.industry and not _keywords_in(competitor.industry.lower()).isdisjoint(_INDUSTRY_HIGH_INCOME_KEYWORDS):
             return {
                 "level": "high",
                 "score": 0.7,
@@ -913,15 +1447,15 @@ class TargIntelCalculator:
             
             # Default fallback
             return {
-                "distribution": self.DEFAULT_VALUES["device_distribution"],
+                "distribution": dict(self.DEFAULT_VALUES["device_distribution"]),
                 "primary": self.DEFAULT_VALUES["primary_device"],
                 "confidence": 0.3
             }
             
         except Exception as e:
-            logger.warning(f"Error in device calculation: {e}")
+            logger.warning("Error in device calculation: %s", e)
             return {
-                "distribution": self.DEFAULT_VALUES["device_distribution"],
+                "distribution": dict(self.DEFAULT_VALUES["device_distribution"]),
                 "primary": self.DEFAULT_VALUES["primary_device"],
                 "confidence": 0.1
             }
@@ -931,30 +1465,11 @@ class TargIntelCalculator:
         distribution = {"mobile": 0.0, "desktop": 0.0, "tablet": 0.0}
         
         try:
-            # Map common device names to our categories
-            device_mapping = {
-                "mobile": ["mobile", "phone", "smartphone", "android", "ios"],
-                "desktop": ["desktop", "computer", "pc", "mac", "laptop"],
-                "tablet": ["tablet", "ipad", "android tablet"]
-            }
-            
             total = 0
             for device, percentage in device_data.items():
                 if isinstance(percentage, (int, float)):
-                    device_lower = str(device).lower()
-                    assigned = False
-                    
-                    for category, keywords in device_mapping.items():
-                        if any(keyword in device_lower for keyword in keywords):
-                            distribution[category] += float(percentage)
-                            total += float(percentage)
-                            assigned = True
-                            break
-                    
-                    if not assigned:
-                        # Default to desktop for unknown devices
-                        distribution["desktop"] += float(percentage)
-                        total += float(percentage)
+                    distribution[_device_category(str(device))] += float(percentage)
+                    total += float(percentage)
             
             # Normalize to 100%
             if total > 0:
@@ -962,7 +1477,7 @@ class TargIntelCalculator:
                     distribution[category] = round(distribution[category] / total, 2)
         
         except Exception as e:
-            logger.warning(f"Error normalizing device distribution: {e}")
+            logger.warning("Error normalizing device distribution: %s", e)
         
         return distribution
     
@@ -975,23 +1490,21 @@ class TargIntelCalculator:
         elif distribution.get("tablet", 0) >= 0.5:
             return "tablet"
         else:
-            return max(distribution, key=distribution.get)
+            return max(distribution.items(), key=itemgetter(1))[0]
     
     def _infer_device_from_ads(self, ads: List[Ad]) -> Optional[Dict]:
         """Infer device targeting from ad format"""
         device_counts = {"mobile": 0, "desktop": 0, "tablet": 0}
         
+        # Formats are classified through the cached helper; the weights are
+        # still added per ad, in ad order, so the float sums match exactly
         for ad in ads:
             if ad.format:
-                format_lower = ad.format.lower()
-                if any(word in format_lower for word in ["story", "reel", "short", "vertical", "tiktok"]):
-                    device_counts["mobile"] += 1
-                elif any(word in format_lower for word in ["carousel", "image", "display", "banner"]):
-                    device_counts["desktop"] += 0.5
-                    device_counts["mobile"] += 0.5
-                elif any(word in format_lower for word in ["video", "youtube"]):
-                    device_counts["desktop"] += 0.7
-                    device_counts["mobile"] += 0.3
+                bucket = _format_device_bucket(ad.format)
+                if bucket:
+                    mobile_weight, desktop_weight = _FORMAT_DEVICE_WEIGHTS[bucket]
+                    device_counts["mobile"] += mobile_weight
+                    device_counts["desktop"] += desktop_weight
         
         total = sum(device_counts.values())
         if total > 0:
@@ -1012,7 +1525,7 @@ class TargIntelCalculator:
         
         return None
     
-    def _calculate_funnel_stage(self, metrics: SurvMetrics, ads: List[Ad]) -> Dict[str, Any]:
+    def _calculate_funnel_stage(self, metrics: SurvMetrics, ads: List[Ad], index: TextIndex) -> Dict[str, Any]:
         """Infer marketing funnel stage"""
         try:
             # Use funnel_stage_distribution from metrics if available
@@ -1028,7 +1541,7 @@ class TargIntelCalculator:
                         }
             
             # Try to infer from ad content
-            funnel_data = self._infer_funnel_from_ads(ads)
+            funnel_data = self._infer_funnel_from_ads(ads, index)
             if funnel_data:
                 return funnel_data
             
@@ -1040,7 +1553,7 @@ class TargIntelCalculator:
             }
             
         except Exception as e:
-            logger.warning(f"Error in funnel calculation: {e}")
+            logger.warning("Error in funnel calculation: %s", e)
             return {
                 "stage": self.DEFAULT_VALUES["funnel_stage"],
                 "score": self.DEFAULT_VALUES["funnel_score"],
@@ -1057,57 +1570,28 @@ class TargIntelCalculator:
                     stage_values[stage] = float(value)
             
             if stage_values:
-                primary_stage = max(stage_values, key=stage_values.get)
+                primary_stage = max(stage_values.items(), key=itemgetter(1))[0]
                 total = sum(stage_values.values())
                 score = stage_values[primary_stage] / total if total > 0 else 0.5
                 
                 # Map to our funnel stage names
-                stage_mapping = {
-                    "awareness": "awareness",
-                    "consideration": "consideration",
-                    "conversion": "conversion",
-                    "retention": "retention",
-                    "acquisition": "awareness",
-                    "engagement": "consideration",
-                    "purchase": "conversion",
-                    "loyalty": "retention"
-                }
-                
-                mapped_stage = stage_mapping.get(primary_stage.lower(), "awareness")
+                mapped_stage = _FUNNEL_STAGE_ALIASES.get(primary_stage.lower(), "awareness")
                 return mapped_stage, round(score, 2)
         
         except Exception as e:
-            logger.warning(f"Error getting primary funnel stage: {e}")
+            logger.warning("Error getting primary funnel stage: %s", e)
         
         return "awareness", 0.5
     
-    def _infer_funnel_from_ads(self, ads: List[Ad]) -> Optional[Dict]:
+    def _infer_funnel_from_ads(self, ads: List[Ad], index: TextIndex) -> Optional[Dict]:
         """Infer funnel stage from ad content"""
+        counts = index.copy_counts
         stage_scores = {
-            "awareness": 0,
-            "consideration": 0,
-            "conversion": 0,
-            "retention": 0
+            stage: sum(map(counts.__getitem__, keywords))
+            for stage, keywords in _AD_FUNNEL_KEYWORDS.items()
         }
         
-        awareness_keywords = ["new", "introducing", "discover", "learn", "what is", "about", "awareness"]
-        consideration_keywords = ["compare", "features", "benefits", "why choose", "review", "guide", "how to"]
-        conversion_keywords = ["buy", "purchase", "order", "shop", "get", "deal", "offer", "sale", "discount", "limited"]
-        retention_keywords = ["thank you", "loyal", "member", "exclusive", "update", "newsletter", "community"]
-        
-        for ad in ads:
-            text = ""
-            if ad.headline:
-                text += " " + ad.headline.lower()
-            if ad.description:
-                text += " " + ad.description.lower()
-            
-            stage_scores["awareness"] += sum(1 for kw in awareness_keywords if kw in text)
-            stage_scores["consideration"] += sum(1 for kw in consideration_keywords if kw in text)
-            stage_scores["conversion"] += sum(1 for kw in conversion_keywords if kw in text)
-            stage_scores["retention"] += sum(1 for kw in retention_keywords if kw in text)
-        
-        primary_stage = max(stage_scores, key=stage_scores.get)
+        primary_stage = max(stage_scores.items(), key=itemgetter(1))[0]
         total_score = sum(stage_scores.values())
         
         if total_score > 0:
@@ -1122,7 +1606,7 @@ class TargIntelCalculator:
         
         return None
     
-    def _calculate_audience_type(self, metrics: SurvMetrics, ads: List[Ad]) -> Dict[str, Any]:
+    def _calculate_audience_type(self, metrics: SurvMetrics, ads: List[Ad], index: TextIndex) -> Dict[str, Any]:
         """Determine if audience is retargeting, broad, etc."""
         try:
             # Try to get from audience_clusters
@@ -1141,7 +1625,7 @@ class TargIntelCalculator:
                         }
             
             # Try to infer from ad content
-            audience_data = self._infer_audience_from_ads(ads)
+            audience_data = self._infer_audience_from_ads(ads, index)
             if audience_data:
                 return audience_data
             
@@ -1153,7 +1637,7 @@ class TargIntelCalculator:
             }
             
         except Exception as e:
-            logger.warning(f"Error in audience calculation: {e}")
+            logger.warning("Error in audience calculation: %s", e)
             return {
                 "type": self.DEFAULT_VALUES["audience_type"],
                 "size": self.DEFAULT_VALUES["audience_size"],
@@ -1165,54 +1649,27 @@ class TargIntelCalculator:
         if not isinstance(audience_clusters, dict):
             return None
         
-        cluster_keys = [str(key).lower() for key in audience_clusters.keys()]
-        
         # Look for audience type indicators
-        retargeting_indicators = ["retarget", "remarket", "existing", "previous", "returning"]
-        lookalike_indicators = ["lookalike", "similar", "alike", "match"]
-        custom_indicators = ["custom", "specific", "targeted", "niche"]
-        
-        for key in cluster_keys:
-            if any(indicator in key for indicator in retargeting_indicators):
-                return "retargeting"
-            elif any(indicator in key for indicator in lookalike_indicators):
-                return "lookalike"
-            elif any(indicator in key for indicator in custom_indicators):
-                return "custom"
+        for key in audience_clusters:
+            found = _keywords_in(str(key).lower())
+            for audience_type, indicators in _CLUSTER_AUDIENCE_INDICATORS:
+                if not found.isdisjoint(indicators):
+                    return audience_type
         
         return "broad"  # Default to broad if no specific indicators found
     
-    def _infer_audience_from_ads(self, ads: List[Ad]) -> Optional[Dict]:
+    def _infer_audience_from_ads(self, ads: List[Ad], index: TextIndex) -> Optional[Dict]:
         """Infer audience type from ad content"""
-        retargeting_indicators = ["existing", "previous", "returning", "again", "back", "reminder"]
-        broad_indicators = ["everyone", "all", "anyone", "public", "general", "wide"]
-        lookalike_indicators = ["similar", "like you", "alike", "match", "compatible"]
-        
-        retargeting_score = 0
-        broad_score = 0
-        lookalike_score = 0
-        
-        for ad in ads:
-            text = ""
-            if ad.headline:
-                text += " " + ad.headline.lower()
-            if ad.description:
-                text += " " + ad.description.lower()
-            
-            retargeting_score += sum(1 for kw in retargeting_indicators if kw in text)
-            broad_score += sum(1 for kw in broad_indicators if kw in text)
-            lookalike_score += sum(1 for kw in lookalike_indicators if kw in text)
-        
+        counts = index.copy_counts
         scores = {
-            "retargeting": retargeting_score,
-            "broad": broad_score,
-            "lookalike": lookalike_score
+            audience_type: sum(map(counts.__getitem__, keywords))
+            for audience_type, keywords in _AD_AUDIENCE_INDICATORS.items()
         }
         
         if all(score == 0 for score in scores.values()):
             return None
         
-        audience_type = max(scores, key=scores.get)
+        audience_type = max(scores.items(), key=itemgetter(1))[0]
         audience_size = self._get_audience_size(ads)
         confidence = min(len(ads) / 10, 1.0)
         
@@ -1224,17 +1681,9 @@ class TargIntelCalculator:
     
     def _get_audience_size(self, ads: List[Ad]) -> str:
         """Determine audience size based on ad count and content"""
-        ad_count = len(ads)
-        if ad_count < 3:
-            return "small"
-        elif ad_count < 10:
-            return "medium"
-        elif ad_count < 20:
-            return "large"
-        else:
-            return "very_large"
+        return _AUDIENCE_SIZES[bisect_right(_AUDIENCE_SIZE_THRESHOLDS, len(ads))]
     
-    def _calculate_bidding_strategy(self, metrics: SurvMetrics, ads: List[Ad]) -> Dict[str, Any]:
+    def _calculate_bidding_strategy(self, metrics: SurvMetrics, index: TextIndex) -> Dict[str, Any]:
         """Infer bidding strategy"""
         try:
             # Use performance metrics to infer bidding strategy
@@ -1269,7 +1718,7 @@ class TargIntelCalculator:
                         }
             
             # Try to infer from ad content
-            bidding_data = self._infer_bidding_from_ads(ads)
+            bidding_data = self._infer_bidding_from_ads(index)
             if bidding_data:
                 return bidding_data
             
@@ -1280,41 +1729,24 @@ class TargIntelCalculator:
             }
             
         except Exception as e:
-            logger.warning(f"Error in bidding calculation: {e}")
+            logger.warning("Error in bidding calculation: %s", e)
             return {
                 "strategy": self.DEFAULT_VALUES["bidding_strategy"],
                 "confidence": self.DEFAULT_VALUES["bidding_confidence"]
             }
     
-    def _infer_bidding_from_ads(self, ads: List[Ad]) -> Optional[Dict]:
+    def _infer_bidding_from_ads(self, index: TextIndex) -> Optional[Dict]:
         """Infer bidding strategy from ad content"""
-        cpc_indicators = ["click", "ctr", "engagement", "action", "visit"]
-        cpm_indicators = ["impression", "view", "awareness", "brand"]
-        troas_indicators = ["roas", "return", "revenue", "sales", "conversion", "purchase"]
-        reach_indicators = ["reach", "audience", "people", "users", "followers"]
-        freq_indicators = ["frequency", "limit", "cap", "maximum", "times"]
-        
+        counts = index.copy_counts
         scores = {
-            "cpc": 0, "cpm": 0, "tROAS": 0, "reach": 0, "frequency_cap": 0
+            strategy: sum(map(counts.__getitem__, keywords))
+            for strategy, keywords in _AD_BIDDING_INDICATORS.items()
         }
         
-        for ad in ads:
-            text = ""
-            if ad.headline:
-                text += " " + ad.headline.lower()
-            if ad.description:
-                text += " " + ad.description.lower()
-            
-            scores["cpc"] += sum(1 for kw in cpc_indicators if kw in text)
-            scores["cpm"] += sum(1 for kw in cpm_indicators if kw in text)
-            scores["tROAS"] += sum(1 for kw in troas_indicators if kw in text)
-            scores["reach"] += sum(1 for kw in reach_indicators if kw in text)
-            scores["frequency_cap"] += sum(1 for kw in freq_indicators if kw in text)
-        
         if all(score == 0 for score in scores.values()):
             return None
         
-        strategy = max(scores, key=scores.get)
+        strategy = max(scores.items(), key=itemgetter(1))[0]
         total_score = sum(scores.values())
         confidence = min(scores[strategy] / max(total_score, 1), 1.0)
         
@@ -1323,40 +1755,23 @@ class TargIntelCalculator:
             "confidence": round(confidence, 2)
         }
     
-    def _calculate_content_analysis(self, ads: List[Ad]) -> Dict[str, Any]:
+    def _calculate_content_analysis(self, ads: List[Ad], index: TextIndex) -> Dict[str, Any]:
         """Analyze content type and call-to-action"""
         try:
             content_types = {"video": 0, "image": 0, "carousel": 0, "story": 0, "text": 0}
-            ctas = {
-                "shop_now": 0, "learn_more": 0, "sign_up": 0, "contact_us": 0,
-                "download": 0, "subscribe": 0, "book_now": 0, "get_started": 0
-            }
             
-            for ad in ads:
-                # Content type from format
-                if ad.format:
-                    format_lower = ad.format.lower()
-                    if any(word in format_lower for word in ["video", "reel", "short", "youtube"]):
-                        content_types["video"] += 1
-                    elif any(word in format_lower for word in ["image", "photo", "picture"]):
-                        content_types["image"] += 1
-                    elif "carousel" in format_lower:
-                        content_types["carousel"] += 1
-                    elif "story" in format_lower:
-                        content_types["story"] += 1
-                    else:
-                        content_types["text"] += 1
-                else:
-                    content_types["image"] += 1  # Default
+            # Content type from format, classifying each distinct format once
+            for ad_format, count in Counter(ad.format for ad in ads).items():
+                content_types[_format_content_type(ad_format)] += count
             
             # Determine primary content type
             if sum(content_types.values()) == 0:
                 content_type = self.DEFAULT_VALUES["content_type"]
             else:
-                content_type = max(content_types, key=content_types.get)
+                content_type = max(content_types.items(), key=itemgetter(1))[0]
             
             # Analyze CTAs from ad content
-            cta_data = self._extract_ctas_from_ads(ads)
+            cta_data = self._extract_ctas_from_ads(index)
             
             confidence = min(len(ads) / 10, 1.0)
             
@@ -1367,37 +1782,22 @@ class TargIntelCalculator:
             }
             
         except Exception as e:
-            logger.warning(f"Error in content analysis: {e}")
+            logger.warning("Error in content analysis: %s", e)
             return {
                 "type": self.DEFAULT_VALUES["content_type"],
                 "cta": self.DEFAULT_VALUES["call_to_action"],
                 "confidence": 0.1
             }
     
-    def _extract_ctas_from_ads(self, ads: List[Ad]) -> Dict:
+    def _extract_ctas_from_ads(self, index: TextIndex) -> Dict:
         """Extract call-to-actions from ad content"""
-        cta_keywords = {
-            "shop_now": ["shop now", "buy now", "purchase", "order", "get it", "buy today"],
-            "learn_more": ["learn more", "find out", "discover", "read more", "see how"],
-            "sign_up": ["sign up", "register", "join", "enroll", "become a member"],
-            "contact_us": ["contact us", "get in touch", "call us", "email us", "message us"],
-            "download": ["download", "get the app", "install", "get your copy"],
-            "subscribe": ["subscribe", "follow", "stay updated", "get updates"],
-            "book_now": ["book now", "reserve", "schedule", "make appointment"],
-            "get_started": ["get started", "start now", "begin", "try free"]
+        cta_counts = {
+            cta_type: sum(not found.isdisjoint(keywords) for found in index.description_keywords)
+            for cta_type, keywords in _AD_CTA_KEYWORDS.items()
         }
         
-        cta_counts = {cta: 0 for cta in cta_keywords.keys()}
-        
-        for ad in ads:
-            if ad.description:
-                text = ad.description.lower()
-                for cta_type, keywords in cta_keywords.items():
-                    if any(keyword in text for keyword in keywords):
-                        cta_counts[cta_type] += 1
-        
         if sum(cta_counts.values()) > 0:
-            primary_cta = max(cta_counts, key=cta_counts.get)
+            primary_cta = max(cta_counts.items(), key=itemgetter(1))[0]
             return {"primary_cta": primary_cta, "counts": cta_counts}
         
         return {"primary_cta": self.DEFAULT_VALUES["call_to_action"]}
@@ -1405,51 +1805,47 @@ class TargIntelCalculator:
     def _calculate_performance_metrics(self, metrics: SurvMetrics) -> Dict[str, Any]:
         """Calculate estimated performance metrics"""
         try:
-            result = {
-                "cpm": self.DEFAULT_VALUES["estimated_cpm"],
-                "cpc": self.DEFAULT_VALUES["estimated_cpc"],
-                "roas": self.DEFAULT_VALUES["estimated_roas"],
-                "engagement_rate": self.DEFAULT_VALUES["engagement_rate"]
-            }
+            result = dict(self.DEFAULT_PERFORMANCE)
             
             if not metrics:
                 return result
             
+            # Read each metrics column once
+            avg_cpm = metrics.avg_cpm
+            avg_cpc = metrics.avg_cpc
+            avg_ctr = metrics.avg_ctr
+            monthly_spend = metrics.estimated_monthly_spend
+            conv_prob = metrics.conversion_probability
+            
             # Use actual metrics when available
-            if metrics.avg_cpm:
-                result["cpm"] = round(float(metrics.avg_cpm), 2)
+            if avg_cpm:
+                result["cpm"] = round(float(avg_cpm), 2)
             
-            if metrics.avg_cpc:
-                result["cpc"] = round(float(metrics.avg_cpc), 2)
+            if avg_cpc:
+                result["cpc"] = round(float(avg_cpc), 2)
             
             # Estimate ROAS from spend and other metrics
-            if metrics.estimated_monthly_spend and metrics.conversion_probability:
-                monthly_spend = float(metrics.estimated_monthly_spend)
-                conv_prob = float(metrics.conversion_probability)
+            if monthly_spend and conv_prob:
+                monthly_spend = float(monthly_spend)
+                conv_prob = float(conv_prob)
                 
-                # Simple ROAS estimation: assume $50 average order value
+                # Simple ROAS estimation: assume $50 average order value, so
+                # (spend * conv_prob / cpc) * 50 / spend, with spend cancelled
                 if monthly_spend > 0 and conv_prob > 0:
-                    estimated_conversions = (monthly_spend * conv_prob) / result["cpc"] if result["cpc"] > 0 else 0
-                    estimated_revenue = estimated_conversions * 50  # $50 average order value
-                    if monthly_spend > 0:
-                        result["roas"] = round(estimated_revenue / monthly_spend, 2)
+                    cpc = result["cpc"]
+                    result["roas"] = round(conv_prob * 50 / cpc, 2) if cpc > 0 else 0.0
             
             # Estimate engagement rate from CTR
-            if metrics.avg_ctr:
-                ctr = float(metrics.avg_ctr)
+            if avg_ctr:
+                ctr = float(avg_ctr)
                 # Engagement rate is typically higher than CTR
                 result["engagement_rate"] = round(ctr * 1.5, 4)  # Estimate
             
             return result
             
         except Exception as e:
-            logger.warning(f"Error in performance calculation: {e}")
-            return {
-                "cpm": self.DEFAULT_VALUES["estimated_cpm"],
-                "cpc": self.DEFAULT_VALUES["estimated_cpc"],
-                "roas": self.DEFAULT_VALUES["estimated_roas"],
-                "engagement_rate": self.DEFAULT_VALUES["engagement_rate"]
-            }
+            logger.warning("Error in performance calculation: %s", e)
+            return dict(self.DEFAULT_PERFORMANCE)
     
     def _calculate_confidence_scores(self, metrics: SurvMetrics, ads: List[Ad],
                                    age_data: Dict, gender_data: Dict, geo_data: Dict,
@@ -1457,158 +1853,130 @@ class TargIntelCalculator:
                                    funnel_data: Dict, audience_data: Dict, bidding_data: Dict) -> Dict[str, float]:
         """Calculate confidence scores for each metric"""
         try:
-            confidence_scores = {}
-            
             # Base confidence on data availability
             has_metrics = bool(metrics)
             ads_count = len(ads)
             
-            # Age confidence
-            confidence_scores["age"] = age_data.get("confidence", 0.1)
-            
-            # Gender confidence
-            confidence_scores["gender"] = gender_data.get("confidence", 0.1)
-            
-            # Geography confidence - higher if we have geo_penetration data
-            geo_confidence = geo_data.get("confidence", 0.1)
-            if has_metrics and metrics.geo_penetration:
-                geo_confidence = max(geo_confidence, 0.7)  # Boost confidence with metrics data
-            confidence_scores["geography"] = geo_confidence
-            
-            # Interest confidence
-            confidence_scores["interests"] = interest_data.get("confidence", 0.1)
-            
-            # Income confidence - higher if we have spend data
-            income_confidence = income_data.get("confidence", 0.1)
-            if has_metrics and metrics.estimated_monthly_spend:
-                income_confidence = max(income_confidence, 0.7)
-            confidence_scores["income"] = income_confidence
-            
-            # Device confidence - higher if we have device_distribution data
-            device_confidence = device_data.get("confidence", 0.1)
-            if has_metrics and metrics.device_distribution:
-                device_confidence = max(device_confidence, 0.8)
-            confidence_scores["device"] = device_confidence
-            
-            # Funnel confidence - higher if we have funnel_stage_distribution data
-            funnel_confidence = funnel_data.get("confidence", 0.1)
-            if has_metrics and metrics.funnel_stage_distribution:
-                funnel_confidence = max(funnel_confidence, 0.8)
-            confidence_scores["funnel"] = funnel_confidence
-            
-            # Audience confidence - higher if we have audience_clusters data
-            audience_confidence = audience_data.get("confidence", 0.1)
-            if has_metrics and metrics.audience_clusters:
-                audience_confidence = max(audience_confidence, 0.7)
-            confidence_scores["audience"] = audience_confidence
-            
-            # Bidding confidence - higher if we have performance metrics
-            bidding_confidence = bidding_data.get("confidence", 0.1)
-            if has_metrics and (metrics.avg_cpc or metrics.avg_cpm or metrics.conversion_probability):
-                bidding_confidence = max(bidding_confidence, 0.6)
-            confidence_scores["bidding"] = bidding_confidence
+            confidence_scores = {
+                "age": age_data.get("confidence", 0.1),
+                "gender": gender_data.get("confidence", 0.1),
+                "geography": geo_data.get("confidence", 0.1),
+                "interests": interest_data.get("confidence", 0.1),
+                "income": income_data.get("confidence", 0.1),
+                "device": device_data.get("confidence", 0.1),
+                "funnel": funnel_data.get("confidence", 0.1),
+                "audience": audience_data.get("confidence", 0.1),
+                "bidding": bidding_data.get("confidence", 0.1),
+            }
+            
+            # Boost confidence where metrics data backs the score
+            if has_metrics:
+                for key, fields, boost in _METRICS_CONFIDENCE_BOOSTS:
+                    if any(getattr(metrics, field) for field in fields):
+                        confidence_scores[key] = max(confidence_scores[key], boost)
             
             # Content confidence
             confidence_scores["content"] = min(ads_count / 10, 1.0) if ads_count > 0 else 0.1
             
-            # Performance confidence
+            # Performance confidence - share of performance metrics we have
             performance_confidence = 0.1
             if has_metrics:
-                # Count how many performance metrics we have
-                metric_count = sum([
-                    1 if metrics.avg_cpm else 0,
-                    1 if metrics.avg_cpc else 0,
-                    1 if metrics.avg_ctr else 0,
-                    1 if metrics.estimated_monthly_spend else 0,
-                ])
+                metric_count = sum(map(bool, _performance_metrics_values(metrics)))
                 performance_confidence = min(metric_count / 4, 1.0)
             confidence_scores["performance"] = performance_confidence
             
             # Adjust based on total data quality
-            data_quality = 0.0
-            if has_metrics:
-                data_quality += 0.5
-            if ads_count >= 5:
-                data_quality += 0.3
-            if ads_count >= 10:
-                data_quality += 0.2
+            data_quality = 0.5 * has_metrics + 0.3 * (ads_count >= 5) + 0.2 * (ads_count >= 10)
             
-            for key in confidence_scores:
-                confidence_scores[key] = round(min(confidence_scores[key] * (0.5 + 0.5 * data_quality), 1.0), 2)
-            
-            return confidence_scores
+            scale = 0.5 + 0.5 * data_quality
+            return {
+                key: round(scaled, 2) if (scaled := score * scale) < 1.0 else 1.0
+                for key, score in confidence_scores.items()
+            }
             
         except Exception as e:
-            logger.warning(f"Error in confidence calculation: {e}")
+            logger.warning("Error in confidence calculation: %s", e)
             # Return default low confidence scores
-            return {key: 0.1 for key in [
-                "age", "gender", "geography", "interests", "income",
-                "device", "funnel", "audience", "bidding", "content", "performance"
-            ]}
+            return dict(_DEFAULT_CONFIDENCE_SCORES)
     
-    def _create_basic_intel(self, competitor: Competitor, user_id: UUID) -> TargIntel:
-        """Create basic targeting intel with defaults when no data is available"""
-        try:
-            targ_intel = TargIntel(
-                competitor_id=competitor.id,
-                user_id=user_id,
-                age_range=self.DEFAULT_VALUES["age_range"],
-                gender_ratio=self.DEFAULT_VALUES["gender_ratio"],
-                primary_gender=self.DEFAULT_VALUES["primary_gender"],
-                geography=self.DEFAULT_VALUES["geography"],
-                primary_location=self.DEFAULT_VALUES["primary_location"],
-                interest_clusters=["general", "business"],
-                primary_interests=["general", "business"],
-                income_level=self.DEFAULT_VALUES["income_level"],
-                income_score=self.DEFAULT_VALUES["income_score"],
-                device_distribution=self.DEFAULT_VALUES["device_distribution"],
-                primary_device=self.DEFAULT_VALUES["primary_device"],
-                funnel_stage=self.DEFAULT_VALUES["funnel_stage"],
-                funnel_score=self.DEFAULT_VALUES["funnel_score"],
-                audience_type=self.DEFAULT_VALUES["audience_type"],
-                audience_size=self.DEFAULT_VALUES["audience_size"],
-                bidding_strategy=self.DEFAULT_VALUES["bidding_strategy"],
-                bidding_confidence=self.DEFAULT_VALUES["bidding_confidence"],
-                content_type=self.DEFAULT_VALUES["content_type"],
-                call_to_action=self.DEFAULT_VALUES["call_to_action"],
-                estimated_cpm=self.DEFAULT_VALUES["estimated_cpm"],
-                estimated_cpc=self.DEFAULT_VALUES["estimated_cpc"],
-                estimated_roas=self.DEFAULT_VALUES["estimated_roas"],
-                engagement_rate=self.DEFAULT_VALUES["engagement_rate"],
-                confidence_scores={key: 0.1 for key in [
-                    "age", "gender", "geography", "interests", "income",
-                    "device", "funnel", "audience", "bidding", "content", "performance"
-                ]},
-                overall_confidence=0.1,
-                last_calculated_at=datetime.utcnow(),
-                is_active=True
-            )
-            
-            self.db.add(targ_intel)
-            self.db.commit()
-            self.db.refresh(targ_intel)
-            
-            logger.info(f"Created basic targeting intel for {competitor.name}")
-            return targ_intel
-            
-        except Exception as e:
-            logger.error(f"Error creating basic intel: {e}")
-            raise
+    def _create_basic_intel(self, competitor: Competitor) -> Dict[str, Any]:
+        """Basic targeting intel values with defaults when no data is available"""
+        template = TargIntelCalculator._basic_intel_values
+        if template is None:
+            template = TargIntelCalculator._basic_intel_values = self._build_basic_intel_values()
+        
+        # Fresh copies of the JSON column values so callers can't alter the template
+        values = dict(template)
+        values["gender_ratio"] = dict(template["gender_ratio"])
+        values["geography"] = self._default_geography()
+        values["interest_clusters"] = list(template["interest_clusters"])
+        values["primary_interests"] = list(template["primary_interests"])
+        values["device_distribution"] = dict(template["device_distribution"])
+        values["confidence_scores"] = dict(template["confidence_scores"])
+        
+        logger.info("Created basic targeting intel for %s", competitor.name)
+        return values
+    
+    def _build_basic_intel_values(self) -> Mapping[str, Any]:
+        """Default values and their content hash, shared by every basic intel row"""
+        values = {
+            "age_min": None,
+            "age_max": None,
+            "age_range": self.DEFAULT_VALUES["age_range"],
+            "gender_ratio": dict(self.DEFAULT_VALUES["gender_ratio"]),
+            "primary_gender": self.DEFAULT_VALUES["primary_gender"],
+            "geography": self._default_geography(),
+            "primary_location": self.DEFAULT_VALUES["primary_location"],
+            "interest_clusters": ["general", "business"],
+            "primary_interests": ["general", "business"],
+            "income_level": self.DEFAULT_VALUES["income_level"],
+            "income_score": self.DEFAULT_VALUES["income_score"],
+            "device_distribution": dict(self.DEFAULT_VALUES["device_distribution"]),
+            "primary_device": self.DEFAULT_VALUES["primary_device"],
+            "funnel_stage": self.DEFAULT_VALUES["funnel_stage"],
+            "funnel_score": self.DEFAULT_VALUES["funnel_score"],
+            "audience_type": self.DEFAULT_VALUES["audience_type"],
+            "audience_size": self.DEFAULT_VALUES["audience_size"],
+            "bidding_strategy": self.DEFAULT_VALUES["bidding_strategy"],
+            "bidding_confidence": self.DEFAULT_VALUES["bidding_confidence"],
+            "content_type": self.DEFAULT_VALUES["content_type"],
+            "call_to_action": self.DEFAULT_VALUES["call_to_action"],
+            "estimated_cpm": self.DEFAULT_VALUES["estimated_cpm"],
+            "estimated_cpc": self.DEFAULT_VALUES["estimated_cpc"],
+            "estimated_roas": self.DEFAULT_VALUES["estimated_roas"],
+            "engagement_rate": self.DEFAULT_VALUES["engagement_rate"],
+            "confidence_scores": dict(_DEFAULT_CONFIDENCE_SCORES),
+            "overall_confidence": 0.1,
+            "raw_analysis": None,
+        }
+        values["content_hash"] = _content_hash(values)
+        return MappingProxyType(values)
     
     def calculate_for_user(self, user_id: UUID, competitor_ids: Optional[List[UUID]] = None,
                          force_recalculate: bool = False) -> Dict[str, Any]:
         """Calculate targeting intelligence for multiple competitors"""
+        # An explicit empty list selects nothing; only None means all competitors
+        if competitor_ids is not None and not competitor_ids:
+            return {
+                "success": False,
+                "message": "No competitor IDs supplied",
+                "total_competitors": 0,
+                "calculated": 0,
+                "failed": 0,
+                "results": []
+            }
+        
         try:
-            # Get competitors
-            query = self.db.query(Competitor).filter(
+            # Get competitors (id and name are all the summary needs)
+            query = select(Competitor.id, Competitor.name).where(
                 Competitor.user_id == user_id,
                 Competitor.is_active == True
             )
             
-            if competitor_ids:
-                query = query.filter(Competitor.id.in_(competitor_ids))
+            if competitor_ids is not None:
+                query = query.where(Competitor.id.in_(competitor_ids))
             
-            competitors = query.all()
+            competitors = self.db.execute(query).all()
             
             if not competitors:
                 return {
@@ -1620,41 +1988,33 @@ class TargIntelCalculator:
                     "results": []
                 }
             
+            # One batched calculation for every competitor
+            intel_by_competitor = self.calculate_for_competitors(
+                [competitor.id for competitor in competitors], user_id, force_recalculate
+            )
+            
             results = []
             calculated = 0
             failed = 0
             
             for competitor in competitors:
-                try:
-                    targ_intel = self.calculate_for_competitor(
-                        competitor.id, user_id, force_recalculate
-                    )
-                    
-                    if targ_intel:
-                        results.append({
-                            "competitor_id": str(competitor.id),
-                            "competitor_name": competitor.name,
-                            "success": True,
-                            "overall_confidence": targ_intel.overall_confidence,
-                            "last_calculated": targ_intel.last_calculated_at.isoformat() if targ_intel.last_calculated_at else None
-                        })
-                        calculated += 1
-                    else:
-                        results.append({
-                            "competitor_id": str(competitor.id),
-                            "competitor_name": competitor.name,
-                            "success": False,
-                            "error": "Calculation failed"
-                        })
-                        failed += 1
-                        
-                except Exception as e:
-                    logger.error(f"Failed to calculate for competitor {competitor.name}: {e}")
+                targ_intel = intel_by_competitor.get(competitor.id)
+                
+                if targ_intel:
+                    results.append({
+                        "competitor_id": str(competitor.id),
+                        "competitor_name": competitor.name,
+                        "success": True,
+                        "overall_confidence": targ_intel.overall_confidence,
+                        "last_calculated": targ_intel.last_calculated_at.isoformat() if targ_intel.last_calculated_at else None
+                    })
+                    calculated += 1
+                else:
                     results.append({
                         "competitor_id": str(competitor.id),
                         "competitor_name": competitor.name,
                         "success": False,
-                        "error": str(e)
+                        "error": "Calculation failed"
                     })
                     failed += 1
             
@@ -1668,7 +2028,7 @@ class TargIntelCalculator:
             }
             
         except Exception as e:
-            logger.error(f"Error in bulk calculation: {e}")
+            logger.error("Error in bulk calculation: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -1,9 +1,69 @@
 # app/services/trending_service.py
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import asyncio
+import copy
+import hashlib
 import os
 import re
+import time
+from bisect import bisect_right
 from datetime import datetime, timezone
+from itertools import chain
+from types import MappingProxyType
+
+import orjson
+
+from app.utils.cache import RedisCache, TTLCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_NON_NUMERIC_RE = re.compile(r'[^\d.]')
+
+# Platforms searched for trending content, in result order
+_PLATFORMS = ("meta", "reddit", "linkedin", "youtube", "instagram")
+
+# Longest wait for one platform before returning the others without it
+_PLATFORM_TIMEOUT_SECONDS = 8.0
+
+# Score bonus per platform, plus one for video content
+_PLATFORM_BONUSES = MappingProxyType({
+    "youtube": 5,
+    "instagram": 8,
+    "tiktok": 10,
+    "meta": 3,
+    "facebook": 3,
+    "reddit": 6,
+    "linkedin": 2,
+})
+_VIDEO_TYPES = ("video", "reel", "short")
+
+# Recency bonus by content age: < 1 hour, < 1 day, < 1 week, < 1 month, older
+_RECENCY_HOURS = (1, 24, 168, 720)
+_RECENCY_BONUSES = (15, 10, 5, 2, 0)
+
+# Trending results are fresh for 5 minutes, then served stale for up to a
+# day while a background search refreshes them
+_TRENDING_FRESH_SECONDS = 300
+_TRENDING_STALE_SECONDS = 86400
+_trending_cache = RedisCache("trending:v1", ttl=_TRENDING_FRESH_SECONDS + _TRENDING_STALE_SECONDS)
+
+# Process-local first tier in front of Redis for hot keywords. Holds the
+# encoded payload (so every hit decodes a private copy) and only while the
+# entry is fresh; stale entries are always revalidated through Redis.
+_trending_local_cache = TTLCache(maxsize=1024, ttl=60)
+
+# Searches in flight by cache key. Concurrent misses and background
+# refreshes for the same key share one task (which holding here also keeps
+# from being garbage-collected) instead of each hitting every platform.
+_inflight_searches: Dict[str, asyncio.Task] = {}
+
+
+def _trending_cache_key(keyword: str, platforms: List[str], limit_per_platform: int) -> str:
+    """Cache key for a search, ignoring keyword case and platform order"""
+    raw = f"{keyword.strip().lower()}|{','.join(sorted(set(platforms)))}|{limit_per_platform}"
+    return hashlib.sha1(raw.encode()).hexdigest()
 
 
 class TrendingSearchService:
@@ -68,48 +128,126 @@ class TrendingSearchService:
                 "error": "API key not configured."
             }
         
-        tasks = []
+        cache_key = _trending_cache_key(keyword, platforms, limit_per_platform)
+        cached = await self._get_cached(cache_key)
+        if cached is not None:
+            result = cached["result"]
+            if time.time() - cached["cached_at"] < _TRENDING_FRESH_SECONDS:
+                cache_status = "HIT"
+            else:
+                cache_status = "STALE"
+                # Refresh in the background; the stale result goes back now
+                self._search_once(cache_key, keyword, platforms, limit_per_platform)
+        else:
+            task, started = self._search_once(cache_key, keyword, platforms, limit_per_platform)
+            # Shielded so a cancelled caller doesn't cancel the shared search
+            result = await asyncio.shield(task)
+            if not started:
+                # Every caller gets its own copy to annotate
+                result = copy.deepcopy(result)
+            cache_status = "MISS"
+        
+        # Echo this request's spelling of the keyword and platform list
+        result["keyword"] = keyword
+        result["summary"]["platforms_searched"] = platforms
+        result["cache_status"] = cache_status
+        return result
+    
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Drop every cached trending search, e.g. after an admin refresh"""
+        _trending_local_cache.clear()
+        _trending_cache.clear()
+    
+    async def _get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Cached {"cached_at", "result"} payload from memory, then Redis"""
+        encoded = _trending_local_cache.get(cache_key)
+        if encoded is not None:
+            return orjson.loads(encoded)
+        
+        # The Redis client is synchronous, so keep its round-trip off the event loop
+        cached = await asyncio.to_thread(_trending_cache.get, cache_key)
+        if cached is not None:
+            self._remember(cache_key, cached, orjson.dumps(cached))
+        return cached
+    
+    def _remember(self, cache_key: str, payload: Dict[str, Any], encoded: bytes) -> None:
+        """Keep a payload in the process-local tier for the rest of its fresh window"""
+        fresh_for = _TRENDING_FRESH_SECONDS - (time.time() - payload["cached_at"])
+        if fresh_for > 0:
+            _trending_local_cache.set(cache_key, encoded, ttl=min(fresh_for, _trending_local_cache.ttl))
+    
+    async def _search_and_cache(self, cache_key: str, keyword: str, platforms: List[str],
+                                limit_per_platform: int) -> Dict[str, Any]:
+        """Run the search and cache it unless it is empty or a platform timed out"""
+        result = await self._search_trending_uncached(keyword, platforms, limit_per_platform)
+        if result["summary"]["total_results"] and not result["summary"]["partial"]:
+            payload = {"cached_at": time.time(), "result": result}
+            self._remember(cache_key, payload, orjson.dumps(payload))
+            await asyncio.to_thread(_trending_cache.set, cache_key, payload)
+        return result
+    
+    def _search_once(self, cache_key: str, keyword: str, platforms: List[str],
+                     limit_per_platform: int) -> Tuple[asyncio.Task, bool]:
+        """
+        The in-flight search task for cache_key, starting one if there is none.
+        
+        Returns the task and whether this call started it.
+        """
+        task = _inflight_searches.get(cache_key)
+        if task is not None:
+            return task, False
+        
+        def finished(task: asyncio.Task) -> None:
+            _inflight_searches.pop(cache_key, None)
+            if not task.cancelled() and task.exception() is not None:
+                exc = task.exception()
+                logger.error(f"Trending search failed for '{keyword}': {exc}", exc_info=exc)
+        
+        task = asyncio.create_task(
+            self._search_and_cache(cache_key, keyword, platforms, limit_per_platform)
+        )
+        _inflight_searches[cache_key] = task
+        task.add_done_callback(finished)
+        return task, True
+    
+    async def _search_trending_uncached(self, keyword: str, platforms: List[str],
+                                        limit_per_platform: int) -> Dict[str, Any]:
+        """Search every requested platform and rank the combined results"""
+        # Only enabled platforms are searched; the rest stay empty. Each
+        # search is bounded so one slow provider can't hold up the others.
+        pending = {}
         
         if "meta" in platforms and self.meta_service:
-            tasks.append(self._search_meta(keyword, limit_per_platform))
-        else:
-            tasks.append(self._return_empty_list())
+            pending["meta"] = asyncio.wait_for(self._search_meta(keyword, limit_per_platform), _PLATFORM_TIMEOUT_SECONDS)
         
         if "reddit" in platforms and self.reddit_service:
-            tasks.append(self._search_reddit(keyword, limit_per_platform))
-        else:
-            tasks.append(self._return_empty_list())
+            pending["reddit"] = asyncio.wait_for(self._search_reddit(keyword, limit_per_platform), _PLATFORM_TIMEOUT_SECONDS)
         
         if "linkedin" in platforms and self.linkedin_service:
-            tasks.append(self._search_linkedin(keyword, limit_per_platform))
-        else:
-            tasks.append(self._return_empty_list())
+            pending["linkedin"] = asyncio.wait_for(self._search_linkedin(keyword, limit_per_platform), _PLATFORM_TIMEOUT_SECONDS)
         
         if "youtube" in platforms and self.youtube_service:
-            tasks.append(self._search_youtube(keyword, limit_per_platform))
-        else:
-            tasks.append(self._return_empty_list())
+            pending["youtube"] = asyncio.wait_for(self._search_youtube(keyword, limit_per_platform), _PLATFORM_TIMEOUT_SECONDS)
         
         if "instagram" in platforms and self.instagram_service:
-            tasks.append(self._search_instagram(keyword, limit_per_platform))
-        else:
-            tasks.append(self._return_empty_list())
+            pending["instagram"] = asyncio.wait_for(self._search_instagram(keyword, limit_per_platform), _PLATFORM_TIMEOUT_SECONDS)
         
         # Execute all searches concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = dict(zip(pending, await asyncio.gather(*pending.values(), return_exceptions=True)))
         
         # Process results
         platform_results = {}
-        result_list = [
-            ("meta", results[0]),
-            ("reddit", results[1]),
-            ("linkedin", results[2]),
-            ("youtube", results[3]),
-            ("instagram", results[4])
-        ]
+        result_list = [(platform_name, results.get(platform_name, [])) for platform_name in _PLATFORMS]
         
+        timed_out = False
+        now = datetime.now(timezone.utc)
         for platform_name, result in result_list:
-            if isinstance(result, Exception):
+            if isinstance(result, asyncio.TimeoutError):
+                print(f"{platform_name} search timed out after {_PLATFORM_TIMEOUT_SECONDS}s")
+                platform_results[platform_name] = []
+                timed_out = True
+            elif isinstance(result, Exception):
                 print(f"Error searching {platform_name}: {result}")
                 platform_results[platform_name] = []
             elif result is None:
@@ -156,7 +294,7 @@ class TrendingSearchService:
                     
                     # Ensure item has score field
                     if "score" not in item:
-                        item["score"] = self._calculate_item_score(item)
+                        item["score"] = self._calculate_item_score(item, now)
                     
                     # Ensure platform field
                     if "platform" not in item:
@@ -167,10 +305,7 @@ class TrendingSearchService:
                 platform_results[platform_name] = processed_items
         
         # Calculate cross-platform rankings
-        all_items = []
-        for platform, items in platform_results.items():
-            for item in items:
-                all_items.append(item)
+        all_items = list(chain.from_iterable(platform_results.values()))
         
         # Sort by score and add ranks
         all_items.sort(key=lambda x: x.get("score", 0), reverse=True)
@@ -195,19 +330,16 @@ class TrendingSearchService:
             "keyword": keyword,
             "results": platform_results,
             "summary": {
-                "total_results": sum(len(items) for items in platform_results.values()),
+                "total_results": sum(map(len, platform_results.values())),
                 "platforms_searched": platforms,
                 "top_score": all_items[0]["score"] if all_items else 0,
-                "average_score": sum(item.get("score", 0) for item in all_items) / len(all_items) if all_items else 0
+                "average_score": sum(item.get("score", 0) for item in all_items) / len(all_items) if all_items else 0,
+                "partial": timed_out
             },
             "top_trending": top_trending,
             "platform_performance": platform_performance
         }
     
-    async def _return_empty_list(self) -> List[Dict[str, Any]]:
-        """Return empty list for disabled platforms"""
-        return []
-    
     async def _search_meta(self, keyword: str, limit: int) -> List[Dict[str, Any]]:
         """Search Meta/Facebook ads"""
         try:
@@ -271,7 +403,7 @@ class TrendingSearchService:
         # Handle "<100" format
         if value.startswith('<'):
             # Extract the number after '<'
-            num_str = re.sub(r'[^\d]', '', value[1:])
+            num_str = _NON_DIGIT_RE.sub('', value[1:])
             if num_str:
                 num = int(num_str)
                 # For "<100", return a reasonable estimate like 50
@@ -304,7 +436,7 @@ class TrendingSearchService:
         try:
             if isinstance(value, str):
                 # Remove currency symbols and commas
-                value = re.sub(r'[^\d.]', '', value)
+                value = _NON_NUMERIC_RE.sub('', value)
                 if value:
                     return float(value)
             return float(value)
@@ -313,6 +445,12 @@ class TrendingSearchService:
     
     def _safe_int(self, value) -> int:
         """Safely convert value to integer"""
+        # Fast paths for the common cases: plain ints and digit-only strings
+        value_type = type(value)
+        if value_type is int:
+            return value
+        if value_type is str and value.isascii() and value.isdigit():
+            return int(value)
         if value is None:
             return 0
         
@@ -326,25 +464,11 @@ class TrendingSearchService:
                     return self._parse_impressions_string(value)
                 
                 # Remove commas and non-numeric characters (keep decimal points)
-                value_clean = re.sub(r'[^\d.]', '', value)
+                value_clean = _NON_NUMERIC_RE.sub('', value)
+                # No digits left means nothing to parse
                 if value_clean:
                     return int(float(value_clean))
-                else:
-                    # Check for K, M, B suffixes
-                    value_lower = value.lower()
-                    if 'k' in value_lower:
-                        num_str = re.sub(r'[^\d.]', '', value_lower.replace('k', ''))
-                        if num_str:
-                            return int(float(num_str) * 1000)
-                    elif 'm' in value_lower:
-                        num_str = re.sub(r'[^\d.]', '', value_lower.replace('m', ''))
-                        if num_str:
-                            return int(float(num_str) * 1000000)
-                    elif 'b' in value_lower:
-                        num_str = re.sub(r'[^\d.]', '', value_lower.replace('b', ''))
-                        if num_str:
-                            return int(float(num_str) * 1000000000)
-                    return 0
+                return 0
             
             # Handle other types
             return int(float(value))
@@ -369,7 +493,7 @@ class TrendingSearchService:
         except:
             return ""
     
-    def _calculate_item_score(self, item: Dict[str, Any]) -> float:
+    def _calculate_item_score(self, item: Dict[str, Any], now: Optional[datetime] = None) -> float:
         """Calculate trending score based on available metrics (ignoring unreliable impressions)"""
         # Extract all possible engagement metrics
         likes = self._safe_int(item.get("likes") or item.get("upvotes") or item.get("like_count") or 0)
@@ -395,7 +519,7 @@ class TrendingSearchService:
             engagement_score += view_bonus
         
         # Add recency bonus
-        recency_bonus = self._calculate_recency_bonus(item)
+        recency_bonus = self._calculate_recency_bonus(item, now)
         engagement_score += recency_bonus
         
         # Add platform-specific bonus
@@ -410,54 +534,34 @@ class TrendingSearchService:
         # Ensure score is between 0-100
         return min(100.0, max(0, engagement_score))
     
-    def _calculate_recency_bonus(self, item: Dict[str, Any]) -> float:
-        """Calculate bonus based on content recency"""
+    def _calculate_recency_bonus(self, item: Dict[str, Any], now: Optional[datetime] = None) -> float:
+        """Calculate bonus based on content recency, relative to now (defaults to the current time)"""
         created_at = item.get("created_at") or item.get("published_at") or item.get("taken_at")
         if not created_at:
             return 0
         
         try:
             if isinstance(created_at, str):
-                # Parse ISO format string
-                if 'Z' in created_at:
-                    created_at = created_at.replace('Z', '+00:00')
+                # Parse ISO format string (handles a trailing 'Z' natively)
                 dt = datetime.fromisoformat(created_at)
             else:
                 dt = created_at
             
-            now = datetime.now(timezone.utc)
+            if now is None:
+                now = datetime.now(timezone.utc)
             hours_ago = (now - dt).total_seconds() / 3600
             
             # Recency bonus decays over time
-            if hours_ago < 1:    # < 1 hour
-                return 15
-            elif hours_ago < 24:  # < 1 day
-                return 10
-            elif hours_ago < 168: # < 1 week
-                return 5
-            elif hours_ago < 720: # < 1 month
-                return 2
-            else:
-                return 0
+            return _RECENCY_BONUSES[bisect_right(_RECENCY_HOURS, hours_ago)]
         except:
             return 0
     
     def _get_platform_bonus(self, platform: str, item: Dict[str, Any]) -> float:
         """Calculate platform-specific bonus"""
-        platform_bonuses = {
-            "youtube": 5,
-            "instagram": 8,
-            "tiktok": 10,
-            "meta": 3,
-            "facebook": 3,
-            "reddit": 6,
-            "linkedin": 2,
-        }
-        
-        bonus = platform_bonuses.get(platform, 0)
+        bonus = _PLATFORM_BONUSES.get(platform, 0)
         
         # Additional bonus for video content
-        if item.get("type") in ["video", "reel", "short"]:
+        if item.get("type") in _VIDEO_TYPES:
             bonus += 3
         
         return bonus
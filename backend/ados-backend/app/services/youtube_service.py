@@ -1,58 +1,92 @@
 # app/services/youtube_service.py
-import requests
+import httpx
+import orjson
 from typing import List, Dict, Any, Optional
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import asyncio
 
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 class YouTubeService:
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 2
+    BASE_URL = "https://api.scrapecreators.com/v1/youtube/search"
+    # Startup waits on the warmup, so it gets a hard bound, transport retries included
+    WARMUP_TIMEOUT = 2
+    
+    # One keep-alive connection pool shared by every instance, so services
+    # created per request don't repeat the TCP/TLS handshake
+    _SHARED_CLIENT: Optional[httpx.AsyncClient] = None
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.base_url = "https://api.scrapecreators.com/v1/youtube/search"
-        self.session = self._create_session()
+        self.base_url = self.BASE_URL
+    
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        return self._get_shared_client()
+    
+    @classmethod
+    def _get_shared_client(cls) -> httpx.AsyncClient:
+        if cls._SHARED_CLIENT is None or cls._SHARED_CLIENT.is_closed:
+            # Transport retries cover connection failures; retryable status
+            # codes are handled in _get
+            cls._SHARED_CLIENT = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(30, connect=10),
+                transport=httpx.AsyncHTTPTransport(
+                    http2=True,
+                    retries=3,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+                ),
+            )
+        return cls._SHARED_CLIENT
     
-    def _create_session(self):
-        session = requests.Session()
-        retry = Retry(
-            total=3,
-            backoff_factor=2,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET"],
-        )
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount("https://", adapter)
-        return session
+    @classmethod
+    async def warmup(cls):
+        """Open a keep-alive connection to the API ahead of the first search"""
+        try:
+            await asyncio.wait_for(cls._get_shared_client().head(cls.BASE_URL), cls.WARMUP_TIMEOUT)
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            logger.warning(f"YouTube API warmup failed: {e}")
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared HTTP client"""
+        if cls._SHARED_CLIENT is not None:
+            await cls._SHARED_CLIENT.aclose()
+            cls._SHARED_CLIENT = None
+    
+    async def _get(self, headers: Dict[str, str], params: Dict[str, str]) -> httpx.Response:
+        for attempt in range(self.MAX_RETRIES + 1):
+            response = await self._client.get(self.base_url, headers=headers, params=params)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                break
+            await asyncio.sleep(self.BACKOFF_FACTOR * (2 ** attempt))
+        
+        response.raise_for_status()
+        return response
     
     async def search_videos(self, query: str, max_results: int = 20, include_extras: bool = True) -> List[Dict[str, Any]]:
         """Search YouTube videos by query"""
-        loop = asyncio.get_event_loop()
-        
         headers = {"x-api-key": self.api_key, "Content-Type": "application/json"}
         params = {
             "query": query,
             "includeExtras": str(include_extras).lower()
         }
         
-        def fetch_videos():
-            response = self.session.get(
-                self.base_url,
-                headers=headers,
-                params=params,
-                timeout=30
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Combine videos and shorts
-            all_content = []
-            if "videos" in data:
-                all_content.extend(data["videos"])
-            if "shorts" in data:
-                all_content.extend(data["shorts"])
-            
-            return all_content[:max_results]
+        response = await self._get(headers, params)
+        data = orjson.loads(response.content)
         
-        raw_videos = await loop.run_in_executor(None, fetch_videos)
+        # Combine videos and shorts
+        raw_videos = []
+        if "videos" in data:
+            raw_videos.extend(data["videos"])
+        if "shorts" in data:
+            raw_videos.extend(data["shorts"])
+        raw_videos = raw_videos[:max_results]
         
         # Format videos for trending analysis
         formatted_videos = []
@@ -1,5 +1,6 @@
 import logging
-from celery import Celery
+from celery import Celery, group
+from itertools import islice
 from sqlalchemy.orm import Session
 import uuid
 from typing import List, Optional
@@ -13,9 +14,19 @@ celery_app = Celery(
     broker='redis://localhost:6379/0',  # Or your Redis URL
     backend='redis://localhost:6379/0'
 )
+# msgpack keeps task args and results compact in the broker and backend;
+# task args must be msgpack-native (UUIDs are passed as str)
+celery_app.conf.update(
+    task_serializer='msgpack',
+    result_serializer='msgpack',
+    accept_content=['msgpack'],
+)
 
 logger = logging.getLogger(__name__)
 
+# Users per group() dispatched by the daily metrics task
+DAILY_METRICS_CHUNK_SIZE = 50
+
 
 @celery_app.task(bind=True, name="calculate_metrics")
 def calculate_metrics_background(
@@ -40,23 +51,25 @@ def calculate_metrics_background(
             for competitor_id in competitor_uuids:
                 # This verification would need to be implemented
                 pass
-            
-            # Calculate for specified competitors
-            for competitor_id in competitor_uuids:
-                try:
-                    calculator.calculate_for_competitor(
-                        competitor_id=competitor_id,
-                        time_period=time_period
-                    )
-                    logger.info(f"Calculated metrics for competitor {competitor_id}")
-                except Exception as e:
-                    logger.error(f"Error calculating metrics for {competitor_id}: {str(e)}")
         else:
-            # Calculate for all user's competitors
-            calculator.calculate_for_user(
-                user_id=user_uuid,
-                time_period=time_period
-            )
+            # All of the user's active competitors
+            from app.models import Competitor
+            competitor_uuids = [
+                competitor_id for (competitor_id,) in db.query(Competitor.id).filter(
+                    Competitor.user_id == user_uuid,
+                    Competitor.is_active == True
+                )
+            ]
+        
+        for competitor_id in competitor_uuids:
+            try:
+                calculator.calculate_for_competitor(
+                    competitor_id=competitor_id,
+                    time_period=time_period
+                )
+                logger.info(f"Calculated metrics for competitor {competitor_id}")
+            except Exception as e:
+                logger.error(f"Error calculating metrics for {competitor_id}: {str(e)}")
         
         return {
             "status": "completed",
@@ -75,33 +88,40 @@ def calculate_metrics_background(
 
 @celery_app.task(name="calculate_daily_metrics")
 def calculate_daily_metrics():
-    """Scheduled task to calculate daily metrics for all users"""
+    """
+    Scheduled task to calculate daily metrics for all users.
+    
+    Dispatches one calculate_metrics task per active user, in groups of
+    DAILY_METRICS_CHUNK_SIZE, so users are calculated in parallel across
+    the worker pool and a slow user doesn't hold up the rest.
+    """
     
     db = SessionLocal()
     try:
         from app.models import User
         
-        # Get all active users
-        users = db.query(User).filter(User.is_active == True).all()
+        # Stream active user ids rather than loading every User row at once
+        user_ids = iter(
+            db.query(User.user_id)
+            .filter(User.is_active.is_(True))
+            .execution_options(stream_results=True)
+            .yield_per(500)
+        )
         
-        logger.info(f"Starting daily metrics calculation for {len(users)} users")
-        
-        calculator = MetricsCalculator(db)
+        dispatched = 0
+        while chunk := list(islice(user_ids, DAILY_METRICS_CHUNK_SIZE)):
+            group(
+                calculate_metrics_background.s(user_id=str(user_id), time_period="daily")
+                for (user_id,) in chunk
+            ).apply_async()
+            dispatched += len(chunk)
         
-        for user in users:
-            try:
-                calculator.calculate_for_user(
-                    user_id=user.id,
-                    time_period="daily"
-                )
-                logger.info(f"Calculated daily metrics for user {user.email}")
-            except Exception as e:
-                logger.error(f"Error calculating daily metrics for {user.email}: {str(e)}")
+        logger.info(f"Dispatched daily metrics calculation for {dispatched} users")
         
-        return {"status": "completed", "users_processed": len(users)}
+        return {"status": "completed", "users_dispatched": dispatched}
         
     except Exception as e:
         logger.error(f"Error in daily metrics calculation: {str(e)}")
         return {"status": "failed", "error": str(e)}
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
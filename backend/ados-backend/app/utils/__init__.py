@@ -12,6 +12,7 @@ from .security import (
 
 from .validators import validate_email, validate_phone, validate_url
 from .logger import setup_logging, get_logger
+from .cache import TTLCache, RedisCache, get_redis_client
 
 __all__ = [
     # Security
@@ -29,5 +30,10 @@ __all__ = [
     
     # Logger
     "setup_logging",
-    "get_logger"
+    "get_logger",
+    
+    # Cache
+    "TTLCache",
+    "RedisCache",
+    "get_redis_client"
 ]
\ No newline at end of file
@@ -0,0 +1,171 @@
+import logging
+import random
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import orjson
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Simple in-process cache with per-entry expiry.
+
+    Entries are dropped once older than ``ttl`` seconds; when ``maxsize`` is
+    reached the oldest entry is evicted. Each worker process has its own copy.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key for ttl seconds (defaults to the cache TTL)."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+            self._data[key] = (expires_at, value)
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove key from the cache, returning its value if present."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_redis_client = None
+
+
+def _json_default(value: Any) -> Any:
+    """orjson fallback for Numeric column values"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def get_redis_client():
+    """
+    Shared Redis client built from settings.REDIS_URL.
+
+    Returns None when REDIS_URL is not configured or the redis package is
+    unavailable, so callers can treat Redis caching as optional.
+    """
+    global _redis_client
+    if _redis_client is None and settings.REDIS_URL:
+        try:
+            import redis
+            _redis_client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+            )
+        except ImportError:
+            logger.warning("redis package not installed; Redis caching disabled")
+    return _redis_client
+
+
+class RedisCache:
+    """
+    JSON values in Redis under a key prefix, with a jittered TTL.
+
+    Redis errors are logged and treated as cache misses so a Redis outage
+    never fails the request.
+    """
+
+    def __init__(self, prefix: str, ttl: int = 300, jitter: int = 30):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.jitter = jitter
+
+    def _key(self, key: Any) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: Any) -> Any:
+        client = get_redis_client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis GET failed for {self._key(key)}: {e}")
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    def get_many(self, keys: List[Any]) -> List[Any]:
+        """Values for keys in one MGET round-trip; None for each miss."""
+        client = get_redis_client()
+        if client is None or not keys:
+            return [None] * len(keys)
+        try:
+            raws = client.mget([self._key(key) for key in keys])
+        except Exception as e:
+            logger.warning(f"Redis MGET failed for {self.prefix}: {e}")
+            return [None] * len(keys)
+        return [orjson.loads(raw) if raw is not None else None for raw in raws]
+
+    def set(self, key: Any, value: Any, ttl: Optional[int] = None) -> None:
+        client = get_redis_client()
+        if client is None:
+            return
+        # Jitter spreads out expiries so hot keys don't all miss at once
+        expiry = (self.ttl if ttl is None else ttl) + random.randint(0, self.jitter)
+        # Serialized outside the try: an unserializable value is a bug, not an outage
+        payload = orjson.dumps(value, default=_json_default)
+        try:
+            client.setex(self._key(key), expiry, payload)
+        except Exception as e:
+            logger.warning(f"Redis SETEX failed for {self._key(key)}: {e}")
+
+    def delete(self, key: Any) -> None:
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            client.delete(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis DEL failed for {self._key(key)}: {e}")
+
+    def clear(self) -> None:
+        """Delete every key under the prefix, scanning in batches so Redis isn't blocked"""
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            batch = []
+            for key in client.scan_iter(match=f"{self.prefix}:*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    client.unlink(*batch)
+                    batch = []
+            if batch:
+                client.unlink(*batch)
+        except Exception as e:
+            logger.warning(f"Redis clear failed for {self.prefix}: {e}")
@@ -1,10 +1,17 @@
+import atexit
+import functools
 import logging
 import logging.config
+import logging.handlers
+import queue
 import sys
 import os
-import json
-from datetime import datetime
+import threading
+import time
 from typing import Dict, Any, Optional
+
+import orjson
+
 from app.config import settings
 
 # Ensure log directory exists
@@ -12,12 +19,30 @@ LOG_DIR = "logs"
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
+# Listener writing queued records to the configured handlers (see setup_logging)
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (second, date/time prefix) of the last formatted second, reused until
+        # it changes; one tuple so concurrent handlers never see a mixed pair
+        self._timestamp_cache = (None, "")
+    
+    def _timestamp(self, created: float) -> str:
+        """ISO-8601 UTC timestamp for a record's creation time."""
+        second = int(created)
+        cached_second, prefix = self._timestamp_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._timestamp_cache = (second, prefix)
+        return "%s.%06dZ" % (prefix, (created - second) * 1e6)
+    
     def format(self, record: logging.LogRecord) -> str:
         log_record = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "module": record.module,
@@ -34,7 +59,47 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, 'extra'):
             log_record.update(record.extra)
         
-        return json.dumps(log_record, ensure_ascii=False)
+        # default=str keeps records with non-JSON extra values loggable
+        return orjson.dumps(log_record, default=str).decode("utf-8")
+
+class TimedMemoryHandler(logging.handlers.MemoryHandler):
+    """
+    MemoryHandler that also flushes its buffer every ``flush_interval`` seconds.
+    
+    Records are written to the target in batches: when the buffer reaches
+    ``capacity``, when a record at ``flushLevel`` or above arrives, on the
+    interval, and on close. A hard crash can lose up to one interval of
+    buffered records.
+    """
+    
+    def __init__(self, capacity: int, flushLevel: int = logging.ERROR,
+                 target: Optional[logging.Handler] = None, flushOnClose: bool = True,
+                 flush_interval: float = 0.5):
+        super().__init__(capacity, flushLevel=flushLevel, target=target, flushOnClose=flushOnClose)
+        self.flush_interval = flush_interval
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="log-flush", daemon=True)
+        self._flusher.start()
+    
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+    
+    def close(self):
+        self._closed.set()
+        super().close()
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a listener in the same process.
+    
+    Records are queued as-is, so formatting (including exception text) is
+    left entirely to the listener's handlers, exactly as if they were
+    attached to the logger directly.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 class ColorFormatter(logging.Formatter):
     """Colored console formatter for development."""
@@ -122,7 +187,8 @@ def setup_logging(
         }
         handlers['error_file'] = error_handler
         
-        # Audit log (for important events)
+        # Audit log (for important events), buffered in memory and written
+        # in batches rather than one write per record
         audit_handler = {
             'class': 'logging.handlers.RotatingFileHandler',
             'filename': os.path.join(LOG_DIR, 'audit.log'),
@@ -132,7 +198,20 @@ def setup_logging(
             'encoding': 'utf-8',
             'level': logging.INFO
         }
-        handlers['audit_file'] = audit_handler
+        audit_buffer_handler = {
+            'class': 'app.utils.logger.TimedMemoryHandler',
+            'capacity': 1000,
+            'flushLevel': logging.ERROR,
+            'target': 'audit_file_target',
+            'flush_interval': 0.5,
+            'level': logging.INFO
+        }
+        handlers['audit_file'] = audit_buffer_handler
+    
+    # Handlers attached to the loggers below; buffer targets are added after
+    logger_handlers = list(handlers.keys())
+    if log_to_file:
+        handlers['audit_file_target'] = audit_handler
     
     # Formatters
     formatters = {
@@ -157,37 +236,37 @@ def setup_logging(
     # Configure loggers
     loggers = {
         '': {  # Root logger
-            'handlers': list(handlers.keys()),
+            'handlers': logger_handlers,
             'level': logging.WARNING,
             'propagate': True
         },
         'app': {
-            'handlers': list(handlers.keys()),
+            'handlers': logger_handlers,
             'level': level,
             'propagate': False
         },
         'app.api': {
-            'handlers': list(handlers.keys()),
+            'handlers': logger_handlers,
             'level': level,
             'propagate': False
         },
         'app.database': {
-            'handlers': list(handlers.keys()),
+            'handlers': logger_handlers,
             'level': level,
             'propagate': False
         },
         'app.services': {
-            'handlers': list(handlers.keys()),
+            'handlers': logger_handlers,
             'level': level,
             'propagate': False
         },
         'uvicorn': {
-            'handlers': list(handlers.keys()),
+            'handlers': logger_handlers,
             'level': logging.WARNING,
             'propagate': False
         },
         'sqlalchemy': {
-            'handlers': list(handlers.keys()),
+            'handlers': logger_handlers,
             'level': logging.WARNING,
             'propagate': False
         }
@@ -203,8 +282,28 @@ def setup_logging(
     }
     
     # Apply configuration
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
     logging.config.dictConfig(logging_config)
     
+    # Move the configured handlers onto a listener thread so formatting and
+    # I/O happen off the calling thread; loggers only enqueue records
+    configured_loggers = [logging.getLogger(name) for name in loggers]
+    listener_handlers = list(dict.fromkeys(
+        handler for configured_logger in configured_loggers for handler in configured_logger.handlers
+    ))
+    if listener_handlers:
+        log_queue = queue.SimpleQueue()
+        queue_handler = LocalQueueHandler(log_queue)
+        for configured_logger in configured_loggers:
+            configured_logger.handlers = [queue_handler]
+        _queue_listener = logging.handlers.QueueListener(
+            log_queue, *listener_handlers, respect_handler_level=True
+        )
+        _queue_listener.start()
+    
     # Get root logger
     logger = logging.getLogger('app')
     logger.info(f"Logging initialized. Level: {log_level}, Environment: {settings.ENVIRONMENT}")
@@ -236,8 +335,7 @@ class AuditLogger:
             'user_id': user_id,
             'email': email,
             'ip_address': ip_address,
-            'success': success,
-            'timestamp': datetime.utcnow().isoformat() + "Z"
+            'success': success
         }
         
         if success:
@@ -255,8 +353,7 @@ class AuditLogger:
             'platform': platform,
             'success': success,
             'ads_count': ads_count,
-            'error': error,
-            'timestamp': datetime.utcnow().isoformat() + "Z"
+            'error': error
         }
         
         if success:
@@ -273,16 +370,26 @@ class AuditLogger:
             'path': path,
             'status_code': status_code,
             'duration_ms': duration_ms,
-            'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat() + "Z"
+            'user_id': user_id
         }
         
         level = logging.ERROR if status_code >= 500 else logging.WARNING if status_code >= 400 else logging.INFO
         self.logger.log(level, f"{method} {path} - {status_code} ({duration_ms:.2f}ms)", extra=extra)
 
+def _stop_queue_listener():
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+# Drain queued records before logging's own shutdown closes the handlers
+atexit.register(_stop_queue_listener)
+
 # Global audit logger instance
 audit_logger = AuditLogger()
 
+def _elapsed_ms(start_ns: int) -> float:
+    """Milliseconds elapsed since a time.perf_counter_ns() reading."""
+    return (time.perf_counter_ns() - start_ns) / 1e6
+
 # Context manager for timing code blocks
 class Timer:
     """Context manager for timing code execution."""
@@ -290,21 +397,24 @@ class Timer:
     def __init__(self, name: str, logger: Optional[logging.Logger] = None):
         self.name = name
         self.logger = logger or get_logger()
-        self.start_time = None
+        self.start_ns = None
     
     def __enter__(self):
-        self.start_time = datetime.utcnow()
+        self.start_ns = time.perf_counter_ns()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        end_time = datetime.utcnow()
-        duration = (end_time - self.start_time).total_seconds() * 1000  # Convert to ms
+        # Nothing to log on success unless DEBUG is enabled
+        if exc_type is None and not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        duration = _elapsed_ms(self.start_ns)
         
         if exc_type:
-            self.logger.error(f"Timer '{self.name}' failed after {duration:.2f}ms", 
+            self.logger.error("Timer '%s' failed after %.2fms", self.name, duration,
                             exc_info=(exc_type, exc_val, exc_tb))
         else:
-            self.logger.debug(f"Timer '{self.name}' completed in {duration:.2f}ms")
+            self.logger.debug("Timer '%s' completed in %.2fms", self.name, duration)
 
 # Function decorator for logging
 def log_execution(logger_name: str = 'app', level: int = logging.DEBUG):
@@ -320,19 +430,26 @@ def log_execution(logger_name: str = 'app', level: int = logging.DEBUG):
     """
     def decorator(func):
         logger = get_logger(logger_name)
+        # Messages are fixed per function, so build them once here
+        start_msg = f"Executing {func.__name__}"
+        done_msg = f"Completed {func.__name__} in %.2fms"
+        fail_msg = f"Failed {func.__name__} after %.2fms: %s"
         
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            logger.log(level, f"Executing {func.__name__}")
-            start_time = datetime.utcnow()
+            # Checked per call since the logger's level can change at runtime
+            enabled = logger.isEnabledFor(level)
+            if enabled:
+                logger.log(level, start_msg)
+            start_ns = time.perf_counter_ns()
             
             try:
                 result = func(*args, **kwargs)
-                duration = (datetime.utcnow() - start_time).total_seconds() * 1000
-                logger.log(level, f"Completed {func.__name__} in {duration:.2f}ms")
+                if enabled:
+                    logger.log(level, done_msg, _elapsed_ms(start_ns))
                 return result
             except Exception as e:
-                duration = (datetime.utcnow() - start_time).total_seconds() * 1000
-                logger.error(f"Failed {func.__name__} after {duration:.2f}ms: {e}", exc_info=True)
+                logger.error(fail_msg, _elapsed_ms(start_ns), e, exc_info=True)
                 raise
         
         return wrapper
@@ -366,7 +483,6 @@ def test_logging():
     
     # Test timer
     with Timer("test_operation"):
-        import time
         time.sleep(0.1)
     
     print("✓ Logging test completed. Check logs/ directory for output.")
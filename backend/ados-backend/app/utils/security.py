@@ -1,14 +1,14 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import bcrypt
+import jwt
 from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
 
 # JWT settings
 SECRET_KEY = settings.SECRET_KEY
@@ -19,7 +19,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
     try:
-        return pwd_context.hash(password)
+        password_bytes = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+        return bcrypt.hashpw(password_bytes, bcrypt.gensalt()).decode("utf-8")
     except Exception as e:
         logger.error(f"Error hashing password: {e}")
         raise
@@ -27,7 +28,8 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        password_bytes = plain_password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+        return bcrypt.checkpw(password_bytes, hashed_password.encode("utf-8"))
     except Exception as e:
         logger.error(f"Error verifying password: {e}")
         return False
@@ -56,7 +58,7 @@ def decode_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
-    except JWTError as e:
+    except jwt.PyJWTError as e:
         logger.error(f"Error decoding token: {e}")
         return None
 
@@ -78,10 +80,10 @@ def validate_password_strength(password: str) -> tuple[bool, str]:
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
     
-    if not any(char.isdigit() for char in password):
+    if not any(map(str.isdigit, password)):
         return False, "Password must contain at least one digit"
     
-    if not any(char.isalpha() for char in password):
+    if not any(map(str.isalpha, password)):
         return False, "Password must contain at least one letter"
     
     # Optional: Add more validations
@@ -99,11 +101,11 @@ def validate_password_strength(password: str) -> tuple[bool, str]:
 # Generate random password (optional, for admin features)
 def generate_random_password(length: int = 12) -> str:
     """Generate a random password."""
-    import random
+    import secrets
     import string
     
     characters = string.ascii_letters + string.digits + "!@#$%^&*"
-    password = ''.join(random.choice(characters) for _ in range(length))
+    password = ''.join(secrets.choice(characters) for _ in range(length))
     return password
 
 # Test password hashing and verification
@@ -2,6 +2,14 @@ import re
 from typing import Optional, Tuple
 from urllib.parse import urlparse
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_DOMAIN_RE = re.compile(r'^([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$')
+_PHONE_STRIP_RE = re.compile(r'[^\d\+]')
+_PHONE_IN_RE = re.compile(r'^(\+91|0)?[6-9]\d{9}$')
+_PHONE_US_RE = re.compile(r'^(\+1)?[2-9]\d{2}[2-9]\d{6}$')
+_PHONE_GENERIC_RE = re.compile(r'^\+?[1-9]\d{9,14}$')
+_HTML_TAG_RE = re.compile(r'<[^>]*>')
+
 def validate_email(email: str) -> bool:
     """
     Validate email format.
@@ -15,11 +23,8 @@ def validate_email(email: str) -> bool:
     if not email or not isinstance(email, str):
         return False
     
-    # Basic email pattern
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    
-    # Check pattern match
-    if not re.match(pattern, email):
+    # Check basic email pattern
+    if not _EMAIL_RE.match(email):
         return False
     
     # Additional checks
@@ -48,7 +53,7 @@ def validate_phone(phone: str, country_code: str = "IN") -> Tuple[bool, str]:
         return False, ""
     
     # Remove all non-digit characters
-    cleaned = re.sub(r'[^\d\+]', '', phone)
+    cleaned = _PHONE_STRIP_RE.sub('', phone)
     
     if not cleaned:
         return False, ""
@@ -56,8 +61,7 @@ def validate_phone(phone: str, country_code: str = "IN") -> Tuple[bool, str]:
     # Country-specific validation
     if country_code == "IN":  # India
         # Indian numbers: +91 or 0 followed by 10 digits
-        pattern = r'^(\+91|0)?[6-9]\d{9}$'
-        if re.match(pattern, cleaned):
+        if _PHONE_IN_RE.match(cleaned):
             # Format to standard: +91XXXXXXXXXX
             if cleaned.startswith('0'):
                 cleaned = '+91' + cleaned[1:]
@@ -67,15 +71,13 @@ def validate_phone(phone: str, country_code: str = "IN") -> Tuple[bool, str]:
     
     elif country_code == "US":  # United States
         # US numbers: +1 followed by 10 digits
-        pattern = r'^(\+1)?[2-9]\d{2}[2-9]\d{6}$'
-        if re.match(pattern, cleaned):
+        if _PHONE_US_RE.match(cleaned):
             if not cleaned.startswith('+1'):
                 cleaned = '+1' + cleaned
             return True, cleaned
     
     # Generic validation (10-15 digits with optional +)
-    pattern = r'^\+?[1-9]\d{9,14}$'
-    if re.match(pattern, cleaned):
+    if _PHONE_GENERIC_RE.match(cleaned):
         if not cleaned.startswith('+'):
             cleaned = '+' + cleaned
         return True, cleaned
@@ -139,10 +141,8 @@ def validate_domain(domain: str) -> bool:
     
     domain = domain.strip().lower()
     
-    # Domain pattern
-    pattern = r'^([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$'
-    
-    if not re.match(pattern, domain):
+    # Check domain pattern
+    if not _DOMAIN_RE.match(domain):
         return False
     
     # Check each part length
@@ -186,11 +186,11 @@ def validate_password(password: str) -> Tuple[bool, str]:
         return False, "Password must be less than 128 characters"
     
     # Check for at least one digit
-    if not any(char.isdigit() for char in password):
+    if not any(map(str.isdigit, password)):
         return False, "Password must contain at least one digit"
     
     # Check for at least one letter
-    if not any(char.isalpha() for char in password):
+    if not any(map(str.isalpha, password)):
         return False, "Password must contain at least one letter"
     
     # Optional: Check for uppercase
@@ -235,7 +235,7 @@ def sanitize_input(text: str, max_length: Optional[int] = None,
     
     # Remove HTML tags if not allowed
     if not allow_html:
-        text = re.sub(r'<[^>]*>', '', text)
+        text = _HTML_TAG_RE.sub('', text)
     
     # Truncate if max_length specified
     if max_length and len(text) > max_length:
@@ -1,11 +1,15 @@
 
 from flask import Flask, request, jsonify
-from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
 from werkzeug.security import generate_password_hash, check_password_hash
+from concurrent.futures import ThreadPoolExecutor
 import datetime
 import jwt
+import orjson
 import os
+import time
 from dotenv import load_dotenv
 
 # --------------------
@@ -13,8 +17,35 @@ from dotenv import load_dotenv
 # --------------------
 load_dotenv()
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for request parsing and jsonify."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
-CORS(app, origins=["*"])  # Dev only
+app.json = OrjsonProvider(app)
+
+
+# CORS: the same static headers on every response, including Flask's
+# automatic OPTIONS preflight replies (dev only: any origin)
+@app.after_request
+def add_cors_headers(response):
+    headers = response.headers
+    headers["Access-Control-Allow-Origin"] = "*"
+    # Preflights get back whatever headers they ask for, as flask_cors did
+    requested_headers = None
+    if request.method == "OPTIONS":
+        requested_headers = request.headers.get("Access-Control-Request-Headers")
+    headers["Access-Control-Allow-Headers"] = requested_headers or "Authorization,Content-Type"
+    headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS"
+    return response
+
 
 SECRET_KEY = os.environ["SECRET_KEY"]
 
@@ -25,6 +56,14 @@ supabase: Client = create_client(
 
 JWT_ALGORITHM = "HS256"
 JWT_EXP_DAYS = 30
+JWT_EXP_SECONDS = JWT_EXP_DAYS * 86400
+
+# Checked against when the email is unknown, so a failed login costs the
+# same PBKDF2 work whether or not the account exists
+DUMMY_PASSWORD_HASH = generate_password_hash("dummy-password", method="pbkdf2:sha256")
+
+# Background writes that the response doesn't wait on (e.g. last_login)
+background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="auth-bg")
 
 
 # --------------------
@@ -36,13 +75,22 @@ def create_jwt(user):
             "user_id": user["user_id"],
             "email": user["email"],
             "name": user["name"],
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(days=JWT_EXP_DAYS)
+            "exp": int(time.time()) + JWT_EXP_SECONDS
         },
         SECRET_KEY,
         algorithm=JWT_ALGORITHM
     )
 
 
+def update_last_login(user_id, logged_in_at):
+    try:
+        supabase.table("users").update({
+            "last_login": logged_in_at
+        }).eq("user_id", user_id).execute()
+    except Exception as e:
+        app.logger.warning("Failed to update last_login for %s: %s", user_id, e)
+
+
 def get_bearer_token():
     auth = request.headers.get("Authorization")
     if not auth or not auth.startswith("Bearer "):
@@ -83,18 +131,20 @@ def signup():
     if len(password) < 8:
         return jsonify({"success": False, "error": "Password too short"}), 400
 
-    existing = supabase.table("users").select("user_id").eq("email", email).execute()
-    if existing.data:
-        return jsonify({"success": False, "error": "Email already exists"}), 409
-
     hashed = generate_password_hash(password, method="pbkdf2:sha256")
 
-    result = supabase.table("users").insert({
-        "name": name,
-        "email": email,
-        "password_hash": hashed,
-        "onboarding_completed": False
-    }).execute()
+    # users.email is UNIQUE, so a duplicate signup fails the insert itself
+    try:
+        result = supabase.table("users").insert({
+            "name": name,
+            "email": email,
+            "password_hash": hashed,
+            "onboarding_completed": False
+        }).execute()
+    except APIError as e:
+        if e.code == "23505":  # unique_violation
+            return jsonify({"success": False, "error": "Email already exists"}), 409
+        raise
 
     user = result.data[0]
     token = create_jwt(user)
@@ -124,8 +174,15 @@ def login():
     if not email or not password:
         return jsonify({"success": False, "error": "Email and password required"}), 400
 
-    res = supabase.table("users").select("*").eq("email", email).execute()
+    res = (
+        supabase.table("users")
+        .select("user_id,name,email,password_hash,onboarding_completed")
+        .eq("email", email)
+        .limit(1)
+        .execute()
+    )
     if not res.data:
+        check_password_hash(DUMMY_PASSWORD_HASH, password)
         return jsonify({"success": False, "error": "Invalid credentials"}), 401
 
     user = res.data[0]
@@ -135,9 +192,9 @@ def login():
 
     token = create_jwt(user)
 
-    supabase.table("users").update({
-        "last_login": datetime.datetime.utcnow().isoformat()
-    }).eq("user_id", user["user_id"]).execute()
+    background_executor.submit(
+        update_last_login, user["user_id"], datetime.datetime.utcnow().isoformat()
+    )
 
     return jsonify({
         "success": True,
@@ -199,5 +256,8 @@ def complete_onboarding():
 # --------------------
 # Run
 # --------------------
+# Development server only. In production serve the app with a WSGI server
+# so requests run concurrently, e.g.:
+#   gunicorn -k gthread -w 4 --threads 8 -b 0.0.0.0:5003 auth:app
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5003, debug=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5003, debug=os.getenv("FLASK_DEBUG") == "1")
\ No newline at end of file